@@ -7,6 +7,18 @@ DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
+# Processed layer format: "csv" (default) or "parquet" (typed, columnar; needs pyarrow)
+PROCESSED_FORMAT = os.environ.get("PIPELINE_PROCESSED_FORMAT", "csv")
+
+# Serving layer engine for full recomputations: "pandas" (default) or "duckdb"
+SERVING_BACKEND = os.environ.get("PIPELINE_SERVING_BACKEND", "pandas")
+
+# Processes normalizing hash partitions of the raw reviews in parallel (1 = in-process)
+TRANSFORM_WORKERS = int(os.environ.get("PIPELINE_TRANSFORM_WORKERS", "1"))
+
+# Dashboard chart sinks: "inline" (base64 in dashboard.html), "png" and/or "svg" files
+DASHBOARD_SINKS = os.environ.get("PIPELINE_DASHBOARD_SINKS", "inline,png").split(",")
+
 # Default File Names
 APPS_FILENAME = "apps_raw.json"
 REVIEWS_FILENAME = "reviews_raw.jsonl"
@@ -26,6 +38,9 @@ STRESS_TEST_FILES = {
 # I will use a generic variable here that can be changed.
 TARGET_APP_ID = "com.google.android.keep" # Example: Google Keep, can be changed.
 
+# Apps tracked in multi-app mode (ingest_reviews.run_many / --app_ids)
+TARGET_APP_IDS = [TARGET_APP_ID]
+
 # Output Data Schemas (Target Column Names)
 CATALOG_COLS = ["appId", "title", "developer", "score", "ratings", "installs", "genre", "price"]
 REVIEWS_COLS = ["app_id", "app_name", "reviewId", "userName", "score", "content", "thumbsUpCount", "at"]
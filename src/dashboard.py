@@ -1,29 +1,66 @@
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
 import logging
 import base64
+import hashlib
+import html
+import importlib.metadata
+import json
+import re
+import types
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from src import config
+from src import config, instrument, storage
+from src.dashboard_files import APP_PAGES_DIRNAME, CHART_FILES, SINKS, output_files
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def fig_to_base64(fig):
-    """Convert a matplotlib figure to a base64-encoded PNG string."""
-    buf = BytesIO()
-    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='#1a1a2e')
-    buf.seek(0)
-    encoded = base64.b64encode(buf.read()).decode('utf-8')
-    buf.close()
-    return encoded
+# Loaded processed artifacts, keyed by path -> ((mtime_ns, size), DataFrame)
+_FRAME_CACHE = {}
 
 
-def generate_charts():
-    """Generate all charts and return them as base64-encoded strings."""
-    charts = {}
-    
-    # Set dark theme for matplotlib
+def load_processed(name):
+    """Load a processed artifact, reusing the cached frame while the file is unchanged."""
+    path = storage.find_processed(name)
+    if path is None:
+        return None
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _FRAME_CACHE.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, storage.read_processed_file(path))
+        _FRAME_CACHE[path] = cached
+    return cached[1]
+
+
+class DashboardData:
+    """
+    Processed inputs of the dashboard, each loaded once and shared by every chart and
+    HTML builder. Builders must treat the frames as read-only since they are cached.
+    """
+
+    def __init__(self):
+        self.daily = load_processed("daily_metrics")
+        self.reviews = load_processed("apps_reviews")
+        self.kpis = load_processed("app_kpis")
+        if self.daily is not None and 'date' in self.daily.columns:
+            self.daily = self.daily.assign(date=pd.to_datetime(self.daily['date']))
+
+
+# Upper bound on chart-rendering worker processes (1 renders in-process)
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# savefig options shared by every chart and output format
+CHART_SAVEFIG = {'dpi': 100, 'bbox_inches': 'tight', 'facecolor': '#1a1a2e'}
+
+
+def apply_theme():
+    """Set the dark dashboard theme on the current process' matplotlib state."""
+    # matplotlib is imported where charts are drawn, so interactive and fully cached
+    # dashboard runs never load it
+    import matplotlib.pyplot as plt
     plt.style.use('dark_background')
     plt.rcParams['figure.facecolor'] = '#1a1a2e'
     plt.rcParams['axes.facecolor'] = '#16213e'
@@ -33,193 +70,383 @@ def generate_charts():
     plt.rcParams['xtick.color'] = '#eaeaea'
     plt.rcParams['ytick.color'] = '#eaeaea'
     plt.rcParams['grid.color'] = '#0f3460'
-    
-    # 1. Daily Metrics Time Series
-    daily_file = config.PROCESSED_DIR / "daily_metrics.csv"
-    if daily_file.exists():
-        df_daily = pd.read_csv(daily_file)
-        if not df_daily.empty and 'date' in df_daily.columns:
-            df_daily['date'] = pd.to_datetime(df_daily['date'])
-            
-            # Plot Volume
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.fill_between(df_daily['date'], df_daily['daily_number_of_reviews'], alpha=0.3, color='#e94560')
-            ax.plot(df_daily['date'], df_daily['daily_number_of_reviews'], marker='o', linestyle='-', color='#e94560', linewidth=2)
-            ax.set_title('Daily Review Volume', fontsize=14, fontweight='bold')
-            ax.set_xlabel('Date')
-            ax.set_ylabel('Count')
-            ax.grid(True, alpha=0.3)
-            charts['volume'] = fig_to_base64(fig)
-            plt.close(fig)
-            logger.info("Generated volume chart")
-
-            # Plot Rating Trend
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.fill_between(df_daily['date'], df_daily['daily_average_rating'], alpha=0.3, color='#00d9ff')
-            ax.plot(df_daily['date'], df_daily['daily_average_rating'], marker='o', linestyle='-', color='#00d9ff', linewidth=2)
-            ax.set_title('Daily Average Rating', fontsize=14, fontweight='bold')
-            ax.set_xlabel('Date')
-            ax.set_ylabel('Average Score')
-            ax.set_ylim(1, 5)
-            ax.grid(True, alpha=0.3)
-            charts['rating'] = fig_to_base64(fig)
-            plt.close(fig)
-            logger.info("Generated rating chart")
-
-    # 2. Score Distribution
-    reviews_file = config.PROCESSED_DIR / "apps_reviews.csv"
-    if reviews_file.exists():
-        df_reviews = pd.read_csv(reviews_file)
-        if not df_reviews.empty and 'score' in df_reviews.columns:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            colors = ['#e94560', '#ff6b6b', '#feca57', '#48dbfb', '#1dd1a1']
-            score_counts = df_reviews['score'].value_counts().sort_index()
-            bars = ax.bar(score_counts.index, score_counts.values, color=colors[:len(score_counts)], edgecolor='white', linewidth=1.5)
-            ax.set_title('Distribution of Review Scores', fontsize=14, fontweight='bold')
-            ax.set_xlabel('Score')
-            ax.set_ylabel('Frequency')
-            ax.set_xticks(range(1, 6))
-            ax.grid(axis='y', alpha=0.3)
-            charts['distribution'] = fig_to_base64(fig)
-            plt.close(fig)
-            logger.info("Generated distribution chart")
-
-    # 3. App Ranking
-    kpis_file = config.PROCESSED_DIR / "app_kpis.csv"
-    if kpis_file.exists():
-        df_kpis = pd.read_csv(kpis_file)
-        if not df_kpis.empty and 'average_rating' in df_kpis.columns:
-            df_sorted = df_kpis.sort_values('average_rating', ascending=True)
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            colors = ['#1dd1a1' if r >= 4 else '#feca57' if r >= 3 else '#e94560' for r in df_sorted['average_rating']]
-            bars = ax.barh(df_sorted['app_name'], df_sorted['average_rating'], color=colors, edgecolor='white', linewidth=1.5)
-            ax.set_xlabel('Average Rating')
-            ax.set_title('App Ranking by Average Rating', fontsize=14, fontweight='bold')
-            ax.set_xlim(0, 5)
-            ax.grid(axis='x', alpha=0.3)
-            charts['ranking'] = fig_to_base64(fig)
-            plt.close(fig)
-            logger.info("Generated ranking chart")
-    
-    return charts
 
 
-def generate_html(charts):
-    """Generate a premium HTML dashboard with embedded charts."""
-    
-    # Load KPIs for summary cards
-    kpis_file = config.PROCESSED_DIR / "app_kpis.csv"
-    kpi_cards = ""
-    if kpis_file.exists():
-        df_kpis = pd.read_csv(kpis_file)
-        if not df_kpis.empty:
-            row = df_kpis.iloc[0]
-            kpi_cards = f"""
-            <div class="kpi-grid">
-                <div class="kpi-card">
-                    <div class="kpi-value">{int(row.get('number_of_reviews', 0)):,}</div>
-                    <div class="kpi-label">Total Reviews</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">{row.get('average_rating', 0):.2f}</div>
-                    <div class="kpi-label">Average Rating</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">{row.get('pct_low_rating_reviews', 0):.1f}%</div>
-                    <div class="kpi-label">Low Rating %</div>
-                </div>
-                <div class="kpi-card">
-                    <div class="kpi-value">{row.get('app_name', 'N/A')}</div>
-                    <div class="kpi-label">App Name</div>
-                </div>
-            </div>
-            """
-    
-    # Build chart sections
-    chart_sections = ""
-    if 'volume' in charts:
-        chart_sections += f'''
-        <div class="chart-card">
-            <h3>📈 Daily Review Volume</h3>
-            <img src="data:image/png;base64,{charts['volume']}" alt="Daily Volume Chart">
-        </div>
-        '''
-    if 'rating' in charts:
-        chart_sections += f'''
-        <div class="chart-card">
-            <h3>⭐ Daily Average Rating</h3>
-            <img src="data:image/png;base64,{charts['rating']}" alt="Daily Rating Chart">
-        </div>
-        '''
-    if 'distribution' in charts:
-        chart_sections += f'''
-        <div class="chart-card">
-            <h3>📊 Score Distribution</h3>
-            <img src="data:image/png;base64,{charts['distribution']}" alt="Score Distribution Chart">
-        </div>
-        '''
-    if 'ranking' in charts:
-        chart_sections += f'''
-        <div class="chart-card full-width">
-            <h3>🏆 App Ranking</h3>
-            <img src="data:image/png;base64,{charts['ranking']}" alt="App Ranking Chart">
-        </div>
-        '''
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>App Reviews Dashboard</title>
-    <style>
-        * {{
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    apply_theme()
+
+
+def plot_volume(df_daily):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.fill_between(df_daily['date'], df_daily['daily_number_of_reviews'], alpha=0.3, color='#e94560')
+    ax.plot(df_daily['date'], df_daily['daily_number_of_reviews'], marker='o', linestyle='-', color='#e94560', linewidth=2)
+    ax.set_title('Daily Review Volume', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Count')
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def plot_rating(df_daily):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.fill_between(df_daily['date'], df_daily['daily_average_rating'], alpha=0.3, color='#00d9ff')
+    ax.plot(df_daily['date'], df_daily['daily_average_rating'], marker='o', linestyle='-', color='#00d9ff', linewidth=2)
+    ax.set_title('Daily Average Rating', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Average Score')
+    ax.set_ylim(1, 5)
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def plot_distribution(score_counts):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 6))
+    colors = ['#e94560', '#ff6b6b', '#feca57', '#48dbfb', '#1dd1a1']
+    ax.bar(score_counts.index, score_counts.values, color=colors[:len(score_counts)], edgecolor='white', linewidth=1.5)
+    ax.set_title('Distribution of Review Scores', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Score')
+    ax.set_ylabel('Frequency')
+    ax.set_xticks(range(1, 6))
+    ax.grid(axis='y', alpha=0.3)
+    return fig
+
+
+def plot_ranking(df_sorted):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    colors = ['#1dd1a1' if r >= 4 else '#feca57' if r >= 3 else '#e94560' for r in df_sorted['average_rating']]
+    ax.barh(df_sorted['app_name'], df_sorted['average_rating'], color=colors, edgecolor='white', linewidth=1.5)
+    ax.set_xlabel('Average Rating')
+    ax.set_title('App Ranking by Average Rating', fontsize=14, fontweight='bold')
+    ax.set_xlim(0, 5)
+    ax.grid(axis='x', alpha=0.3)
+    return fig
+
+
+def _daily(data, column):
+    df_daily = data.daily
+    if df_daily is None or df_daily.empty or 'date' not in df_daily.columns:
+        return None
+    return df_daily[['date', column]]
+
+
+def volume_payload(data):
+    return _daily(data, 'daily_number_of_reviews')
+
+
+def rating_payload(data):
+    return _daily(data, 'daily_average_rating')
+
+
+def distribution_payload(data):
+    df_reviews = data.reviews
+    if df_reviews is None or df_reviews.empty or 'score' not in df_reviews.columns:
+        return None
+    return df_reviews['score'].value_counts().sort_index()
+
+
+def ranking_payload(data):
+    df_kpis = data.kpis
+    if df_kpis is None or df_kpis.empty or 'average_rating' not in df_kpis.columns:
+        return None
+    return df_kpis[['app_name', 'average_rating']].sort_values('average_rating', ascending=True)
+
+
+# Chart registry: name -> (payload builder, plot function). The file stem of each
+# chart's exported images is in CHART_FILES (src/dashboard_files.py).
+# Payload builders return the small pre-aggregated input of the chart, or None to skip it.
+CHARTS = {
+    'volume': (volume_payload, plot_volume),
+    'rating': (rating_payload, plot_rating),
+    'distribution': (distribution_payload, plot_distribution),
+    'ranking': (ranking_payload, plot_ranking),
+}
+
+
+# Incremental regeneration: fingerprint of each chart's inputs and its cached encoded images
+MANIFEST_FILE = "dashboard_manifest.json"
+CACHE_DIRNAME = "dashboard_cache"
+
+
+def _code_bytes(code):
+    # The bytecode only indexes attribute, global and local names, so hash the names too;
+    # nested code objects (comprehensions, lambdas) repr with their address, so recurse instead
+    parts = [code.co_code, repr(code.co_names).encode('utf-8'), repr(code.co_varnames).encode('utf-8')]
+    for const in code.co_consts:
+        parts.append(_code_bytes(const) if isinstance(const, types.CodeType) else repr(const).encode('utf-8'))
+    return b''.join(parts)
+
+
+def chart_fingerprint(plot, payload):
+    """
+    Content hash of everything a rendered chart depends on: its payload (values, index,
+    columns and dtypes), the plot and theme code, the savefig options and matplotlib version.
+    """
+    h = hashlib.sha256()
+    if isinstance(payload, pd.DataFrame):
+        h.update(repr(list(zip(payload.columns, map(str, payload.dtypes)))).encode('utf-8'))
+    else:
+        h.update(str(payload.dtype).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(payload, index=True).values.tobytes())
+    h.update(_code_bytes(plot.__code__))
+    h.update(_code_bytes(apply_theme.__code__))
+    h.update(repr(sorted(CHART_SAVEFIG.items())).encode('utf-8'))
+    h.update(importlib.metadata.version('matplotlib').encode('utf-8'))
+    return h.hexdigest()
+
+
+class ChartCache:
+    """
+    Encoded chart images from previous runs plus a manifest of the fingerprint they were
+    rendered from. A chart is reused only when its fingerprint matches and every needed
+    format is cached. The manifest also records the fingerprint each exported sink file
+    was last written with, so a file is rewritten whenever it is behind its chart.
+    """
+
+    def __init__(self, directory=None):
+        directory = directory or config.PROCESSED_DIR
+        self.path = directory / MANIFEST_FILE
+        self.cache_dir = directory / CACHE_DIRNAME
+        self.charts = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.charts = json.load(f).get("charts", {})
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Ignoring unreadable dashboard manifest {self.path}: {e}")
+
+    def _image_path(self, name, fmt):
+        return self.cache_dir / f"{name}.{fmt}"
+
+    def get(self, name, fingerprint, formats):
+        entry = self.charts.get(name)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        paths = {fmt: self._image_path(name, fmt) for fmt in formats}
+        if not all(path.exists() for path in paths.values()):
+            return None
+        return {fmt: path.read_bytes() for fmt, path in paths.items()}
+
+    def invalidate(self, names):
+        for name in names:
+            self.charts.pop(name, None)
+
+    def put(self, name, fingerprint, images):
+        for fmt, image in images.items():
+            path = self._image_path(name, fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(image)
+        entry = self.charts.get(name)
+        formats = set(images)
+        exports = {}
+        if entry is not None and entry.get("fingerprint") == fingerprint:
+            formats.update(entry.get("formats", []))
+            exports = entry.get("exports", {})
+        self.charts[name] = {"fingerprint": fingerprint, "formats": sorted(formats), "exports": exports}
+
+    def exported(self, name, path):
+        """True if the sink file `path` exists and was written from the chart's current fingerprint."""
+        entry = self.charts.get(name)
+        if entry is None or not path.exists():
+            return False
+        return entry.get("exports", {}).get(path.name) == entry.get("fingerprint")
+
+    def record_export(self, name, path):
+        entry = self.charts[name]
+        entry.setdefault("exports", {})[path.name] = entry["fingerprint"]
+
+    def prune(self, keep, namespace=None):
+        """
+        Drop the entries of one namespace (names under "<namespace>/", or top-level names
+        without a namespace) that are not in `keep`, then delete every cached image that
+        no entry references any more.
+        """
+        def in_namespace(name):
+            return name.startswith(f"{namespace}/") if namespace else "/" not in name
+
+        for name in [name for name in self.charts if in_namespace(name) and name not in keep]:
+            del self.charts[name]
+        if not self.cache_dir.exists():
+            return
+        referenced = {self._image_path(name, fmt) for name, entry in self.charts.items() for fmt in entry.get("formats", [])}
+        for path in sorted(self.cache_dir.rglob("*"), reverse=True):
+            if path.is_file() and path not in referenced:
+                path.unlink()
+            elif path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a half-written manifest
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"charts": self.charts}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def render_images(plot, payload, formats):
+    """Draw one chart once and encode it in each requested format (runs inside a worker process)."""
+    import matplotlib.pyplot as plt
+    fig = plot(payload)
+    images = {}
+    for fmt in formats:
+        buf = BytesIO()
+        fig.savefig(buf, format=fmt, **CHART_SAVEFIG)
+        images[fmt] = buf.getvalue()
+    plt.close(fig)
+    return images
+
+
+def render_jobs(jobs, formats, max_workers=None, cache=None, namespace=None):
+    """
+    Render chart jobs, given as name -> (plot function, payload), to name -> {format: bytes}.
+    Figures are drawn in a process pool on the Agg backend; workers receive only the
+    payloads and send back the encoded images. With a ChartCache, charts whose input
+    fingerprint is unchanged are loaded from it instead, and cached charts of `namespace`
+    that are no longer among the jobs are pruned from it.
+    """
+    images = {}
+    pending = {}
+    fingerprints = {}
+    for name, (plot, payload) in jobs.items():
+        if cache is not None:
+            fingerprints[name] = chart_fingerprint(plot, payload)
+            cached = cache.get(name, fingerprints[name], formats)
+            if cached is not None:
+                images[name] = cached
+                continue
+        images[name] = None
+        pending[name] = (plot, payload, formats)
+
+    if cache is not None:
+        logger.info(f"Reusing {len(images) - len(pending)} cached chart(s), rendering {len(pending)}")
+
+    max_workers = min(max_workers or MAX_WORKERS, len(pending))
+    if max_workers <= 1:
+        if pending:
+            apply_theme()
+        rendered = {name: render_images(*job) for name, job in pending.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            futures = {name: pool.submit(render_images, *job) for name, job in pending.items()}
+            rendered = {name: future.result() for name, future in futures.items()}
+
+    if cache is not None:
+        for name, image in rendered.items():
+            cache.put(name, fingerprints[name], image)
+        cache.prune(jobs, namespace)
+        cache.save()
+    images.update(rendered)
+    return images
+
+
+def sink_formats(sinks):
+    """Image formats needed by the given dashboard sinks."""
+    unknown = set(sinks) - set(SINKS)
+    if unknown:
+        raise ValueError(f"Unsupported dashboard sinks: {sorted(unknown)}")
+    return sorted({SINKS[sink] for sink in sinks})
+
+
+def render_charts(data, sinks=None, max_workers=None, cache=None):
+    """
+    Render every registered chart whose inputs are available, returning name -> {format: bytes}
+    for the formats needed by `sinks`.
+    """
+    formats = sink_formats(sinks or config.DASHBOARD_SINKS)
+    jobs = {}
+    for name, (build_payload, plot) in CHARTS.items():
+        payload = build_payload(data)
+        if payload is not None:
+            jobs[name] = (plot, payload)
+    return render_jobs(jobs, formats, max_workers, cache)
+
+
+def generate_charts(data=None, max_workers=None):
+    """Generate all charts and return them as base64-encoded strings."""
+    if data is None:
+        data = DashboardData()
+    images = render_charts(data, ['inline'], max_workers)
+    for name in images:
+        logger.info(f"Generated {name} chart")
+    return {name: base64.b64encode(image['png']).decode('utf-8') for name, image in images.items()}
+
+
+def export_images(images, sinks, cache=None):
+    """
+    Write rendered charts to the file sinks and return the written paths. With a
+    ChartCache, files already written from the chart's current fingerprint are left
+    untouched and every written file is recorded in its manifest.
+    """
+    paths = []
+    for sink in sinks:
+        if sink == 'inline':
+            continue
+        fmt = SINKS[sink]
+        for name, image in images.items():
+            path = config.PROCESSED_DIR / f"{CHART_FILES[name]}.{fmt}"
+            if cache is not None and cache.exported(name, path):
+                continue
+            path.write_bytes(image[fmt])
+            paths.append(path)
+            if cache is not None:
+                cache.record_export(name, path)
+    if cache is not None:
+        cache.save()
+    return paths
+
+
+# Stylesheet shared by the static and interactive dashboard pages
+DASHBOARD_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
             min-height: 100vh;
             color: #eaeaea;
             padding: 2rem;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
         
-        header {{
+        header {
             text-align: center;
             margin-bottom: 3rem;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             background: linear-gradient(90deg, #e94560, #00d9ff);
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
             background-clip: text;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             color: #8892b0;
             font-size: 1.1rem;
-        }}
+        }
         
-        .kpi-grid {{
+        .kpi-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1.5rem;
             margin-bottom: 3rem;
-        }}
+        }
         
-        .kpi-card {{
+        .kpi-card {
             background: rgba(255, 255, 255, 0.05);
             backdrop-filter: blur(10px);
             border: 1px solid rgba(255, 255, 255, 0.1);
@@ -227,85 +454,164 @@ def generate_html(charts):
             padding: 1.5rem;
             text-align: center;
             transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
+        }
         
-        .kpi-card:hover {{
+        .kpi-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 10px 30px rgba(233, 69, 96, 0.2);
-        }}
+        }
         
-        .kpi-value {{
+        .kpi-value {
             font-size: 2rem;
             font-weight: bold;
             color: #e94560;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .kpi-label {{
+        .kpi-label {
             color: #8892b0;
             font-size: 0.9rem;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
-        .charts-grid {{
+        .charts-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(500px, 1fr));
             gap: 2rem;
-        }}
+        }
         
-        .chart-card {{
+        .chart-card {
             background: rgba(255, 255, 255, 0.05);
             backdrop-filter: blur(10px);
             border: 1px solid rgba(255, 255, 255, 0.1);
             border-radius: 16px;
             padding: 1.5rem;
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .chart-card:hover {{
+        .chart-card:hover {
             transform: translateY(-3px);
-        }}
+        }
         
-        .chart-card.full-width {{
+        .chart-card.full-width {
             grid-column: 1 / -1;
-        }}
+        }
         
-        .chart-card h3 {{
+        .chart-card h3 {
             color: #00d9ff;
             margin-bottom: 1rem;
             font-size: 1.2rem;
-        }}
+        }
         
-        .chart-card img {{
+        .chart-card img {
             width: 100%;
             height: auto;
             border-radius: 8px;
-        }}
+        }
         
-        footer {{
+        footer {
             text-align: center;
             margin-top: 3rem;
             color: #8892b0;
             font-size: 0.9rem;
-        }}
+        }
         
-        @media (max-width: 600px) {{
-            .charts-grid {{
+        @media (max-width: 600px) {
+            .charts-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            h1 {{
+            h1 {
                 font-size: 1.8rem;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+
+def kpi_cards_html(row):
+    """Summary KPI cards of one app_kpis row."""
+    return f"""
+            <div class="kpi-grid">
+                <div class="kpi-card">
+                    <div class="kpi-value">{int(row.get('number_of_reviews', 0)):,}</div>
+                    <div class="kpi-label">Total Reviews</div>
+                </div>
+                <div class="kpi-card">
+                    <div class="kpi-value">{row.get('average_rating', 0):.2f}</div>
+                    <div class="kpi-label">Average Rating</div>
+                </div>
+                <div class="kpi-card">
+                    <div class="kpi-value">{row.get('pct_low_rating_reviews', 0):.1f}%</div>
+                    <div class="kpi-label">Low Rating %</div>
+                </div>
+                <div class="kpi-card">
+                    <div class="kpi-value">{row.get('app_name', 'N/A')}</div>
+                    <div class="kpi-label">App Name</div>
+                </div>
+            </div>
+            """
+
+
+def generate_html(charts, data=None, row=None, heading="📱 App Reviews Dashboard",
+                  subtitle="Real-time analytics and insights from user reviews"):
+    """
+    Generate a premium HTML dashboard with embedded charts. KPI cards show `row`
+    (one app_kpis row), by default the first app of the processed KPIs.
+    """
+    if row is None:
+        if data is None:
+            data = DashboardData()
+        df_kpis = data.kpis
+        if df_kpis is not None and not df_kpis.empty:
+            row = df_kpis.iloc[0]
+    kpi_cards = kpi_cards_html(row) if row is not None else ""
+    
+    # Build chart sections
+    chart_sections = ""
+    if 'volume' in charts:
+        chart_sections += f'''
+        <div class="chart-card">
+            <h3>📈 Daily Review Volume</h3>
+            <img src="data:image/png;base64,{charts['volume']}" alt="Daily Volume Chart">
+        </div>
+        '''
+    if 'rating' in charts:
+        chart_sections += f'''
+        <div class="chart-card">
+            <h3>⭐ Daily Average Rating</h3>
+            <img src="data:image/png;base64,{charts['rating']}" alt="Daily Rating Chart">
+        </div>
+        '''
+    if 'distribution' in charts:
+        chart_sections += f'''
+        <div class="chart-card">
+            <h3>📊 Score Distribution</h3>
+            <img src="data:image/png;base64,{charts['distribution']}" alt="Score Distribution Chart">
+        </div>
+        '''
+    if 'ranking' in charts:
+        chart_sections += f'''
+        <div class="chart-card full-width">
+            <h3>🏆 App Ranking</h3>
+            <img src="data:image/png;base64,{charts['ranking']}" alt="App Ranking Chart">
+        </div>
+        '''
+    
+    html = f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>App Reviews Dashboard</title>
+    <style>
+{DASHBOARD_CSS}    </style>
 </head>
 <body>
     <div class="container">
         <header>
-            <h1>📱 App Reviews Dashboard</h1>
-            <p class="subtitle">Real-time analytics and insights from user reviews</p>
+            <h1>{heading}</h1>
+            <p class="subtitle">{subtitle}</p>
         </header>
         
         {kpi_cards}
@@ -324,81 +630,407 @@ def generate_html(charts):
     return html
 
 
-def run():
+# Client-side dashboard: Plotly.js renders from a compact columnar JSON payload
+PLOTLY_JS_URL = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+INTERACTIVE_KPI_COLS = ['app_id', 'app_name', 'number_of_reviews', 'average_rating', 'pct_low_rating_reviews',
+                        'first_review_date', 'most_recent_review_date']
+
+
+def _columnar(df):
+    """
+    DataFrame -> {column: [values]} with missing values as JSON nulls. Datetimes (as read
+    from Parquet) become strings in the format the CSV artifacts hold.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+        columns[col] = values.astype(object).where(values.notna(), None).tolist()
+    return columns
+
+
+def interactive_payload(data):
+    """
+    Compact columnar payload of the interactive dashboard, or None without reviews.
+    App and day labels are stored once and referenced by integer codes; per-(app, day)
+    counts and score sums let the browser rebuild daily_metrics for any app selection,
+    and app_kpis is shipped as-is for the KPI cards and the ranking.
+    """
+    df_reviews = data.reviews
+    if df_reviews is None or df_reviews.empty or 'app_id' not in df_reviews.columns:
+        return None
+
+    df_kpis = data.kpis if data.kpis is not None else pd.DataFrame(columns=['app_id'])
+    apps = pd.Index(df_kpis['app_id'].dropna().unique()).append(
+        pd.Index(df_reviews['app_id'].dropna().unique())).unique()
+    kpis = df_kpis.set_index('app_id').reindex(apps)
+    kpis['app_name'] = kpis['app_name'].fillna(pd.Series(apps, index=apps)) if 'app_name' in kpis.columns else apps
+    kpis = kpis.reset_index().rename(columns={'index': 'app_id'})
+    kpis = kpis[[c for c in INTERACTIVE_KPI_COLS if c in kpis.columns]]
+
+    app_codes = pd.Categorical(df_reviews['app_id'], categories=apps).codes
+    days = pd.to_datetime(df_reviews['at'], errors='coerce').dt.normalize()
+    day_codes, day_labels = pd.factorize(days, sort=True)
+    score = pd.to_numeric(df_reviews['score'], errors='coerce')
+    frame = pd.DataFrame({
+        'app': app_codes,
+        'day': day_codes,
+        'reviewId': df_reviews['reviewId'].to_numpy(),
+        'score': score.to_numpy(),
+        'low': (score <= 2).to_numpy(),
+    })
+
+    daily = frame.groupby(['app', 'day']).agg(
+        n=('reviewId', 'count'),
+        rated=('score', 'count'),
+        score_sum=('score', 'sum'),
+        low=('low', 'sum'),
+    ).reset_index()
+    scores = frame.dropna(subset=['score']).groupby(['app', 'score']).size().rename('n').reset_index()
+
+    return {
+        'days': [d.strftime('%Y-%m-%d') for d in day_labels],
+        'kpis': _columnar(kpis),
+        'daily': _columnar(daily),
+        'scores': _columnar(scores),
+    }
+
+
+def generate_interactive_html(payload):
+    """Generate the interactive HTML dashboard around a payload from `interactive_payload`."""
+    payload_json = json.dumps(payload, separators=(',', ':'), allow_nan=False).replace('</', '<\\/')
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>App Reviews Dashboard (Interactive)</title>
+    <script src="{PLOTLY_JS_URL}"></script>
+    <style>
+{DASHBOARD_CSS}
+        .filter-bar {{
+            text-align: center;
+            margin-bottom: 2rem;
+        }}
+        
+        .filter-bar select {{
+            background: #16213e;
+            color: #eaeaea;
+            border: 1px solid #e94560;
+            border-radius: 8px;
+            padding: 0.5rem 1rem;
+            font-size: 1rem;
+        }}
+        
+        .chart-card .plot {{
+            width: 100%;
+            height: 380px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>📱 App Reviews Dashboard</h1>
+            <p class="subtitle">Interactive analytics, aggregated in your browser</p>
+        </header>
+        
+        <div class="filter-bar">
+            <select id="app-filter"><option value="">All apps</option></select>
+        </div>
+        
+        <div class="kpi-grid">
+            <div class="kpi-card"><div class="kpi-value" id="kpi-reviews"></div><div class="kpi-label">Total Reviews</div></div>
+            <div class="kpi-card"><div class="kpi-value" id="kpi-rating"></div><div class="kpi-label">Average Rating</div></div>
+            <div class="kpi-card"><div class="kpi-value" id="kpi-low"></div><div class="kpi-label">Low Rating %</div></div>
+            <div class="kpi-card"><div class="kpi-value" id="kpi-apps"></div><div class="kpi-label">App Name</div></div>
+        </div>
+        
+        <div class="charts-grid">
+            <div class="chart-card"><h3>📈 Daily Review Volume</h3><div class="plot" id="volume"></div></div>
+            <div class="chart-card"><h3>⭐ Daily Average Rating</h3><div class="plot" id="rating"></div></div>
+            <div class="chart-card"><h3>📊 Score Distribution</h3><div class="plot" id="distribution"></div></div>
+            <div class="chart-card full-width"><h3>🏆 App Ranking</h3><div class="plot" id="ranking"></div></div>
+        </div>
+        
+        <footer>
+            <p>Generated by Data Pipeline • Powered by Python & Plotly</p>
+        </footer>
+    </div>
+    <script>
+    const DATA = {payload_json};
+    const K = DATA.kpis, D = DATA.daily, S = DATA.scores;
+    const filter = document.getElementById('app-filter');
+    K.app_name.forEach((name, i) => filter.add(new Option(name, i)));
+
+    const layout = (xTitle, yTitle, extra) => Object.assign({{
+        paper_bgcolor: 'rgba(0,0,0,0)', plot_bgcolor: '#16213e', font: {{color: '#eaeaea'}},
+        margin: {{l: 60, r: 20, t: 10, b: 50}},
+        xaxis: {{title: xTitle, gridcolor: '#0f3460'}}, yaxis: {{title: yTitle, gridcolor: '#0f3460'}}
+    }}, extra || {{}});
+    const config = {{responsive: true, displayModeBar: false}};
+
+    function render() {{
+        const app = filter.value === '' ? null : Number(filter.value);
+        const nDays = DATA.days.length;
+        const n = new Array(nDays).fill(0), rated = new Array(nDays).fill(0), sum = new Array(nDays).fill(0);
+        let total = 0, totalRated = 0, totalSum = 0, totalLow = 0;
+        for (let i = 0; i < D.app.length; i++) {{
+            if (app !== null && D.app[i] !== app) continue;
+            total += D.n[i]; totalRated += D.rated[i]; totalSum += D.score_sum[i]; totalLow += D.low[i];
+            const d = D.day[i];
+            if (d < 0) continue;
+            n[d] += D.n[i]; rated[d] += D.rated[i]; sum[d] += D.score_sum[i];
+        }}
+        const days = [], volume = [], rating = [];
+        for (let d = 0; d < nDays; d++) {{
+            if (n[d] === 0 && rated[d] === 0) continue;
+            days.push(DATA.days[d]); volume.push(n[d]); rating.push(rated[d] ? sum[d] / rated[d] : null);
+        }}
+
+        document.getElementById('kpi-reviews').textContent = total.toLocaleString('en-US');
+        document.getElementById('kpi-rating').textContent = totalRated ? (totalSum / totalRated).toFixed(2) : 'N/A';
+        document.getElementById('kpi-low').textContent = total ? (100 * totalLow / total).toFixed(1) + '%' : 'N/A';
+        document.getElementById('kpi-apps').textContent = app === null ? K.app_name.length + ' apps' : K.app_name[app];
+
+        Plotly.react('volume', [{{x: days, y: volume, type: 'scatter', mode: 'lines+markers', fill: 'tozeroy',
+            line: {{color: '#e94560', width: 2}}}}], layout('Date', 'Count'), config);
+        Plotly.react('rating', [{{x: days, y: rating, type: 'scatter', mode: 'lines+markers', fill: 'tozeroy',
+            line: {{color: '#00d9ff', width: 2}}}}], layout('Date', 'Average Score', {{yaxis: {{title: 'Average Score', range: [1, 5], gridcolor: '#0f3460'}}}}), config);
+
+        const counts = {{}};
+        for (let i = 0; i < S.app.length; i++) {{
+            if (app !== null && S.app[i] !== app) continue;
+            counts[S.score[i]] = (counts[S.score[i]] || 0) + S.n[i];
+        }}
+        const scores = Object.keys(counts).map(Number).sort((a, b) => a - b);
+        const colors = ['#e94560', '#ff6b6b', '#feca57', '#48dbfb', '#1dd1a1'];
+        Plotly.react('distribution', [{{x: scores, y: scores.map(s => counts[s]), type: 'bar',
+            marker: {{color: scores.map((s, i) => colors[i % colors.length]), line: {{color: 'white', width: 1.5}}}}}}],
+            layout('Score', 'Frequency', {{xaxis: {{title: 'Score', dtick: 1, gridcolor: '#0f3460'}}}}), config);
+
+        const order = K.app_name.map((_, i) => i).filter(i => K.average_rating && K.average_rating[i] !== null)
+            .sort((a, b) => K.average_rating[a] - K.average_rating[b]);
+        const ratings = order.map(i => K.average_rating[i]);
+        Plotly.react('ranking', [{{y: order.map(i => K.app_name[i]), x: ratings, type: 'bar', orientation: 'h',
+            marker: {{color: ratings.map(r => r >= 4 ? '#1dd1a1' : r >= 3 ? '#feca57' : '#e94560'),
+                opacity: order.map(i => app === null || i === app ? 1 : 0.3), line: {{color: 'white', width: 1.5}}}}}}],
+            layout('Average Rating', '', {{xaxis: {{title: 'Average Rating', range: [0, 5], gridcolor: '#0f3460'}},
+                margin: {{l: 160, r: 20, t: 10, b: 50}}, height: Math.max(380, 28 * order.length)}}), config);
+    }}
+
+    filter.addEventListener('change', render);
+    render();
+    </script>
+</body>
+</html>
+'''
+
+
+def run_interactive():
+    """Write dashboard_interactive.html; no server-side chart rendering is involved."""
+    logger.info("Generating interactive dashboard...")
+    with instrument.step("interactive_payload") as step:
+        data = DashboardData()
+        payload = interactive_payload(data)
+        step.add_rows(rows_in=len(data.reviews) if data.reviews is not None else 0)
+    if payload is None:
+        logger.warning("No reviews found. Ensure processed data exists.")
+        return
+    output_path = config.PROCESSED_DIR / "dashboard_interactive.html"
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(generate_interactive_html(payload))
+    logger.info(f"Saved interactive dashboard: {output_path}")
+
+
+# Per-app drilldown pages: one page per app_kpis row plus an index, under
+# PROCESSED_DIR / APP_PAGES_DIRNAME
+APP_CHARTS = ['volume', 'rating', 'distribution']
+
+APP_INDEX_CSS = """
+        a.app-card {
+            display: block;
+            color: inherit;
+            text-decoration: none;
+        }
+        
+        .app-meta {
+            color: #8892b0;
+            font-size: 0.85rem;
+            margin-top: 0.5rem;
+        }
+"""
+
+
+def write_if_changed(path, content):
+    """Write a text file unless it already holds `content`; returns whether it was written."""
+    if path.exists() and path.read_text(encoding="utf-8") == content:
+        return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def app_page_name(app_id):
+    """File-system safe page name of an app."""
+    return re.sub(r'[^\w.-]', '_', str(app_id))
+
+
+def app_views(reviews):
+    """
+    Per-app chart payloads, app_id -> {chart name: payload} for APP_CHARTS, built from a
+    single grouped pass over apps_reviews: daily metrics and score counts are aggregated
+    for all apps at once and only the small aggregates are split per app.
+    """
+    frame = pd.DataFrame({
+        'app_id': reviews['app_id'],
+        'date': pd.to_datetime(reviews['at'], errors='coerce').dt.normalize(),
+        'reviewId': reviews['reviewId'],
+        'score': pd.to_numeric(reviews['score'], errors='coerce'),
+    })
+    daily = frame.groupby(['app_id', 'date']).agg(
+        daily_number_of_reviews=('reviewId', 'count'),
+        daily_average_rating=('score', 'mean'),
+    ).reset_index()
+    score_counts = frame.groupby(['app_id', 'score']).size()
+
+    views = {}
+    for app_id, df_daily in daily.groupby('app_id', sort=False):
+        df_daily = df_daily.reset_index(drop=True)
+        views[app_id] = {
+            'volume': df_daily[['date', 'daily_number_of_reviews']],
+            'rating': df_daily[['date', 'daily_average_rating']],
+        }
+    for app_id, counts in score_counts.groupby(level='app_id', sort=False):
+        views.setdefault(app_id, {})['distribution'] = counts.droplevel('app_id')
+    return views
+
+
+def generate_app_index(df_kpis):
+    """Index page linking every app page, with one KPI card per app (most reviewed first)."""
+    cards = ""
+    for row in df_kpis.sort_values('number_of_reviews', ascending=False).to_dict('records'):
+        rating = row.get('average_rating')
+        rating = f"{rating:.2f}" if pd.notna(rating) else "N/A"
+        cards += f"""
+            <a class="kpi-card app-card" href="{app_page_name(row['app_id'])}.html">
+                <div class="kpi-value">{rating}</div>
+                <div class="kpi-label">{html.escape(str(row.get('app_name', row['app_id'])))}</div>
+                <div class="app-meta">{int(row.get('number_of_reviews', 0)):,} reviews • {row.get('pct_low_rating_reviews', 0):.1f}% low rating</div>
+            </a>"""
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>App Reviews Dashboard - All Apps</title>
+    <style>
+{DASHBOARD_CSS}{APP_INDEX_CSS}    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>📱 All Apps</h1>
+            <p class="subtitle">{len(df_kpis):,} apps • select one for its drilldown</p>
+        </header>
+        
+        <div class="kpi-grid">{cards}
+        </div>
+        
+        <footer>
+            <p>Generated by Data Pipeline • Powered by Python & Matplotlib</p>
+        </footer>
+    </div>
+</body>
+</html>'''
+
+
+def run_app_pages(max_workers=None, force=False):
+    """
+    Write a drilldown page per app of app_kpis plus an index page. The charts of all
+    apps are rendered together in one process pool and reuse the dashboard chart cache.
+    """
+    logger.info("Generating app pages...")
+    data = DashboardData()
+    df_kpis = data.kpis
+    if df_kpis is None or df_kpis.empty or data.reviews is None:
+        logger.warning("No app KPIs or reviews found. Ensure processed data exists.")
+        return
+    output_dir = config.PROCESSED_DIR / APP_PAGES_DIRNAME
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with instrument.step("app_views") as step:
+        views = app_views(data.reviews)
+        step.add_rows(rows_in=len(data.reviews), rows_out=len(views))
+    jobs = {}
+    for app_id in df_kpis['app_id']:
+        for chart, payload in views.get(app_id, {}).items():
+            jobs[f"{APP_PAGES_DIRNAME}/{app_page_name(app_id)}/{chart}"] = (CHARTS[chart][1], payload)
+    cache = ChartCache()
+    if force:
+        cache.invalidate(jobs)
+    with instrument.step("render_app_charts") as step:
+        images = render_jobs(jobs, ['png'], max_workers, cache, namespace=APP_PAGES_DIRNAME)
+        step.add_rows(rows_out=len(images))
+
+    written = 0
+    for _, row in df_kpis.iterrows():
+        page = app_page_name(row['app_id'])
+        charts = {}
+        for chart in APP_CHARTS:
+            image = images.get(f"{APP_PAGES_DIRNAME}/{page}/{chart}")
+            if image is not None:
+                charts[chart] = base64.b64encode(image['png']).decode('utf-8')
+        name = html.escape(str(row.get('app_name', row['app_id'])))
+        content = generate_html(charts, row=row, heading=f"📱 {name}",
+                                subtitle=f'{html.escape(str(row["app_id"]))} • <a href="index.html" style="color: #00d9ff;">All apps</a>')
+        written += write_if_changed(output_dir / f"{page}.html", content)
+    write_if_changed(output_dir / "index.html", generate_app_index(df_kpis))
+    logger.info(f"Saved {written} changed app page(s) of {len(df_kpis)} and index: {output_dir}")
+    instrument.record_rows(rows_in=len(df_kpis), rows_out=written)
+
+
+def run(sinks=None, max_workers=None, force=False):
     logger.info("Generating Dashboard...")
+    sinks = sinks or config.DASHBOARD_SINKS
     
-    # Generate charts as base64
-    charts = generate_charts()
+    # Load every processed input once for all charts
+    with instrument.step("load_inputs") as step:
+        data = DashboardData()
+        step.add_rows(rows_out=len(data.reviews) if data.reviews is not None else 0)
+
+    # Render each chart once, in every format the sinks need; unchanged charts come from the cache
+    cache = ChartCache()
+    if force:
+        cache.invalidate(CHARTS)
+    with instrument.step("render_charts") as step:
+        images = render_charts(data, sinks, max_workers, cache)
+        step.add_rows(rows_out=len(images))
+    instrument.record_rows(rows_in=len(data.reviews) if data.reviews is not None else 0, rows_out=len(images))
     
-    if not charts:
+    if not images:
         logger.warning("No charts generated. Ensure processed data exists.")
         return
+    logger.info(f"Generated charts: {', '.join(images)}")
     
-    # Generate HTML
-    html_content = generate_html(charts)
-    
-    # Save HTML file
-    output_path = config.PROCESSED_DIR / "dashboard.html"
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    
-    logger.info(f"Saved dashboard: {output_path}")
+    if 'inline' in sinks:
+        charts = {name: base64.b64encode(image['png']).decode('utf-8') for name, image in images.items()}
+
+        # Generate HTML
+        with instrument.step("generate_html"):
+            html_content = generate_html(charts, data)
+        
+        # Save HTML file, unless identical to the current one
+        output_path = config.PROCESSED_DIR / "dashboard.html"
+        if write_if_changed(output_path, html_content):
+            logger.info(f"Saved dashboard: {output_path}")
+        else:
+            logger.info(f"Dashboard unchanged: {output_path}")
     
-    # Also save individual PNG files for backwards compatibility
-    daily_file = config.PROCESSED_DIR / "daily_metrics.csv"
-    if daily_file.exists():
-        df_daily = pd.read_csv(daily_file)
-        if not df_daily.empty and 'date' in df_daily.columns:
-            df_daily['date'] = pd.to_datetime(df_daily['date'])
-            
-            plt.figure(figsize=(10, 5))
-            plt.plot(df_daily['date'], df_daily['daily_number_of_reviews'], marker='o', linestyle='-')
-            plt.title('Daily Review Volume')
-            plt.xlabel('Date')
-            plt.ylabel('Count')
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(config.PROCESSED_DIR / "dashboard_daily_volume.png")
-            plt.close()
-
-            plt.figure(figsize=(10, 5))
-            plt.plot(df_daily['date'], df_daily['daily_average_rating'], marker='o', linestyle='-', color='orange')
-            plt.title('Daily Average Rating')
-            plt.xlabel('Date')
-            plt.ylabel('Average Score')
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(config.PROCESSED_DIR / "dashboard_daily_rating.png")
-            plt.close()
-
-    reviews_file = config.PROCESSED_DIR / "apps_reviews.csv"
-    if reviews_file.exists():
-        df_reviews = pd.read_csv(reviews_file)
-        if not df_reviews.empty and 'score' in df_reviews.columns:
-            plt.figure(figsize=(8, 6))
-            df_reviews['score'].hist(bins=5, range=(1, 6), edgecolor='black')
-            plt.title('Distribution of Review Scores')
-            plt.xlabel('Score')
-            plt.ylabel('Frequency')
-            plt.xticks(range(1, 6))
-            plt.grid(axis='y', alpha=0.75)
-            plt.savefig(config.PROCESSED_DIR / "dashboard_score_dist.png")
-            plt.close()
-
-    kpis_file = config.PROCESSED_DIR / "app_kpis.csv"
-    if kpis_file.exists():
-        df_kpis = pd.read_csv(kpis_file)
-        if not df_kpis.empty and 'average_rating' in df_kpis.columns:
-            df_sorted = df_kpis.sort_values('average_rating', ascending=True)
-            plt.figure(figsize=(10, 6))
-            colors = ['green' if r >= 4 else 'orange' if r >= 3 else 'red' for r in df_sorted['average_rating']]
-            plt.barh(df_sorted['app_name'], df_sorted['average_rating'], color=colors)
-            plt.xlabel('Average Rating')
-            plt.title('App Ranking by Average Rating')
-            plt.xlim(0, 5)
-            plt.tight_layout()
-            plt.savefig(config.PROCESSED_DIR / "dashboard_app_ranking.png")
-            plt.close()
+    # Export standalone image files (PNG kept for backwards compatibility)
+    for path in export_images(images, sinks, cache):
+        logger.info(f"Saved chart: {path}")
 
 
 if __name__ == "__main__":
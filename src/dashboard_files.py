@@ -0,0 +1,33 @@
+"""
+Files written by the dashboard stage. Kept out of src/dashboard.py, which imports
+pandas, so the pipeline can check whether the stage is fresh without importing it.
+"""
+from src import config
+
+# Output sinks -> image format: "inline" embeds base64 PNGs in dashboard.html,
+# "png" and "svg" write one file per chart next to it
+SINKS = {
+    'inline': 'png',
+    'png': 'png',
+    'svg': 'svg',
+}
+
+# Chart name (see CHARTS in src/dashboard.py) -> file stem of its exported images
+CHART_FILES = {
+    'volume': 'dashboard_daily_volume',
+    'rating': 'dashboard_daily_rating',
+    'distribution': 'dashboard_score_dist',
+    'ranking': 'dashboard_app_ranking',
+}
+
+# Per-app drilldown pages: one page per app_kpis row plus an index, under PROCESSED_DIR
+APP_PAGES_DIRNAME = "dashboard_apps"
+
+
+def output_files(sinks):
+    """Files written by dashboard.run() for the given sinks, if every chart has data."""
+    paths = [config.PROCESSED_DIR / "dashboard.html"] if 'inline' in sinks else []
+    for sink in sinks:
+        if sink != 'inline':
+            paths += [config.PROCESSED_DIR / f"{stem}.{SINKS[sink]}" for stem in CHART_FILES.values()]
+    return paths
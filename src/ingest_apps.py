@@ -1,18 +1,27 @@
 import json
 import logging
-from google_play_scraper import app
+from concurrent.futures import ThreadPoolExecutor
 from src import config
+from src.ingest_reviews import MAX_REQUESTS_PER_SECOND, MAX_WORKERS, RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def run(output_file=None):
+def run(output_file=None, app_ids=None, limiter=None):
     """
     Fetches raw app metadata and saves it as JSON.
+    With `app_ids`, fetches the apps concurrently and saves a JSON list with one entry
+    per fetched app instead; `limiter` is a RateLimiter shared with other fetches.
     """
     if output_file is None:
         output_file = config.RAW_DIR / config.APPS_FILENAME
     
+    if app_ids is not None:
+        return _run_many(output_file, app_ids, limiter=limiter)
+
+    # Imported on use so the CLI does not pay for the scraper in other stages
+    from google_play_scraper import app
+
     app_id = config.TARGET_APP_ID
     logger.info(f"Fetching metadata for app: {app_id}")
     
@@ -35,5 +44,33 @@ def run(output_file=None):
         logger.error(f"Failed to ingest app data: {e}")
         # In a real pipeline, we might raise e, but for this lab, logging is good.
 
+def _run_many(output_file, app_ids, max_workers=MAX_WORKERS, limiter=None):
+    from google_play_scraper import app
+    if limiter is None:
+        limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+    def fetch(app_id):
+        limiter.wait()
+        logger.info(f"Fetching metadata for app: {app_id}")
+        try:
+            return app(app_id, lang='en', country='us')
+        except Exception as e:
+            logger.error(f"Failed to ingest app data for {app_id}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = [result for result in pool.map(fetch, app_ids) if result is not None]
+
+    # Keep the previous catalog rather than replacing it with an empty one
+    if not results:
+        logger.error(f"No app metadata fetched, leaving {output_file} unchanged")
+        return
+
+    config.RAW_DIR.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    logger.info(f"Saved metadata for {len(results)} apps to {output_file}")
+
 if __name__ == "__main__":
     run()
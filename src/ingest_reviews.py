@@ -1,7 +1,14 @@
+import gzip
 import json
 import logging
-from google_play_scraper import reviews, Sort
-from src import config
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from src import config, instrument
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -10,63 +17,487 @@ logger = logging.getLogger(__name__)
 REVIEWS_PER_PAGE = 200  # Smaller batches to avoid rate limiting
 MAX_PAGES = 10          # Maximum number of pages to fetch (200 * 10 = 2000 reviews max)
 
+# Output settings
+FSYNC_EVERY = 10        # Pages between fsyncs (every page is still flushed to the OS)
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
 
-def run(output_file=None):
+# Multi-app settings
+MAX_WORKERS = 8         # Apps fetched concurrently
+MAX_REQUESTS_PER_SECOND = 4.0  # Shared across all workers
+
+# Offline stand-in for the Play Store (see fake_reviews)
+FAKE_REVIEWS_PER_APP = 5000
+FAKE_NEWEST_AT = datetime(2025, 1, 1)
+FAKE_CONTENTS = (
+    "Love it!",
+    "Great app, I use it every day.",
+    "Good but sync is slow.",
+    "Crashes after the last update.",
+    "Too many ads, uninstalling.",
+)
+
+
+class RateLimiter:
+    """
+    Spaces out calls across threads so that at most `rate` calls start per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _dump_token(token):
+    # google_play_scraper tokens are plain slot objects; store their fields
+    slots = getattr(type(token), "__slots__", None)
+    if slots:
+        return {"__slots__": {name: getattr(token, name) for name in slots}}
+    return token
+
+
+def _load_token(data):
+    if isinstance(data, dict) and "__slots__" in data:
+        from google_play_scraper.features.reviews import _ContinuationToken
+        return _ContinuationToken(**data["__slots__"])
+    return data
+
+
+class Checkpoint:
+    """
+    Resume state of a review ingestion run, saved as JSON next to the output file.
+
+    For each app it keeps the continuation token of the next page, the number of pages
+    fetched and whether the app is finished. `offset` is the size of the output file
+    after the last page recorded here; anything past it was written by a page whose
+    token was never saved, so it is cut off before resuming.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = Path(output_file)
+        self.path = self.output_file.with_name(self.output_file.stem + ".checkpoint.json")
+        self.offset = 0
+        self.apps = {}
+
+    @classmethod
+    def load(cls, output_file, resume=True, append=False):
+        """
+        Picks up the saved checkpoint if `resume` and one exists. Otherwise starts
+        fresh: from an empty output, or after its current contents if `append`.
+        """
+        checkpoint = cls(output_file)
+        if resume and checkpoint.path.exists() and checkpoint.output_file.exists():
+            with open(checkpoint.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            checkpoint.offset = state["offset"]
+            checkpoint.apps = state["apps"]
+        elif append and checkpoint.output_file.exists():
+            checkpoint.offset = checkpoint.output_file.stat().st_size
+        return checkpoint
+
+    def start(self):
+        """
+        Prepares the output file: truncated to the checkpointed offset when resuming,
+        emptied on a fresh run (kept whole on a fresh appending run).
+        """
+        with open(self.output_file, "a", encoding="utf-8") as f:
+            f.truncate(self.offset)
+
+    def app_state(self, app_id):
+        return self.apps.setdefault(app_id, {
+            "continuation_token": None, "pages": 0, "reviews": 0, "newest": None, "done": False
+        })
+
+    def token(self, app_id):
+        return _load_token(self.app_state(app_id)["continuation_token"])
+
+    def record_page(self, app_id, continuation_token, n_reviews, offset):
+        state = self.app_state(app_id)
+        state["continuation_token"] = _dump_token(continuation_token)
+        state["pages"] += 1
+        state["reviews"] += n_reviews
+        self.offset = offset
+        self.save()
+
+    def mark_done(self, app_id):
+        self.app_state(app_id)["done"] = True
+        self.save()
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": self.offset, "apps": self.apps}, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _parse_at(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class Watermarks:
+    """
+    Newest review ('at' and 'reviewId') ingested so far for each app, saved as JSON
+    next to the output file. Incremental runs stop paging once they reach it.
+    """
+
+    def __init__(self, output_file):
+        output_file = Path(output_file)
+        self.path = output_file.with_name(output_file.stem + ".watermark.json")
+        self.apps = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.apps = json.load(f)
+
+    def get(self, app_id):
+        return self.apps.get(app_id)
+
+    def update(self, app_id, newest):
+        self.apps[app_id] = newest
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.apps, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def is_newer(review, watermark):
+        """True unless the review is the watermark review or older than it."""
+        if review.get("reviewId") == watermark["reviewId"]:
+            return False
+        at, watermark_at = _parse_at(review.get("at")), _parse_at(watermark["at"])
+        if at is None or watermark_at is None:
+            return True
+        return at >= watermark_at
+
+
+def fetch_pages(app_id, on_page, fetch=None, limiter=None, continuation_token=None, start_page=0):
+    """
+    Walks the review pages of one app (newest first), handing each page and the
+    continuation token of the following page to `on_page`; paging stops early when
+    `on_page` returns False. Paging starts from
+    `continuation_token` / `start_page` when resuming an interrupted run.
+    `fetch` has the signature of google_play_scraper.reviews (the default), so a local
+    stand-in can be passed for offline runs. Returns the number of reviews fetched.
+    """
+    # Imported on use so the CLI does not pay for the scraper in other stages
+    from google_play_scraper import reviews, Sort
+    fetch = fetch or reviews
+    total_fetched = 0
+
+    for page in range(start_page, MAX_PAGES):
+        logger.info(f"[{app_id}] Fetching page {page + 1}/{MAX_PAGES}...")
+        if limiter is not None:
+            limiter.wait()
+
+        result, continuation_token = fetch(
+            app_id,
+            lang='en',
+            country='us',
+            sort=Sort.NEWEST,
+            count=REVIEWS_PER_PAGE,
+            continuation_token=continuation_token
+        )
+
+        if not result:
+            logger.info(f"[{app_id}] No more reviews to fetch.")
+            break
+
+        keep_paging = on_page(result, continuation_token)
+        total_fetched += len(result)
+        logger.info(f"[{app_id}] Fetched {len(result)} reviews (total: {total_fetched})")
+
+        if keep_paging is False:
+            logger.info(f"[{app_id}] Reached already-ingested reviews.")
+            break
+
+        # Stop if no more pages
+        if continuation_token is None:
+            logger.info(f"[{app_id}] Reached end of reviews.")
+            break
+
+    return total_fetched
+
+
+def fake_reviews(app_id, lang='en', country='us', sort=None, count=100, filter_score_with=None,
+                 filter_device_with=None, continuation_token=None):
+    """
+    Deterministic offline stand-in for google_play_scraper.reviews, with the same
+    signature and return value: a page of generated reviews (newest first) and the
+    continuation token of the next page. The same app and token always give the same
+    page, so it can be passed as `fetch` for benchmarks and offline runs (--fake_reviews).
+    """
+    from google_play_scraper.features.reviews import _ContinuationToken
+
+    start = 0
+    if continuation_token is not None:
+        if continuation_token.token is None:
+            return [], continuation_token
+        start, count = int(continuation_token.token), continuation_token.count
+    stop = min(start + count, FAKE_REVIEWS_PER_APP)
+
+    rng = random.Random(f"{app_id}:{start}")
+    result = []
+    for i in range(start, stop):
+        version = f"1.{rng.randrange(10)}.0"
+        result.append({
+            "reviewId": f"{app_id}-{i:06d}",
+            "userName": f"user{rng.randrange(1000)}",
+            "userImage": None,
+            "content": rng.choice(FAKE_CONTENTS),
+            "score": rng.randint(1, 5),
+            "thumbsUpCount": rng.randrange(50),
+            "reviewCreatedVersion": version,
+            "at": FAKE_NEWEST_AT - timedelta(minutes=7 * i),
+            "replyContent": None,
+            "repliedAt": None,
+            "appVersion": version,
+        })
+    token = str(stop) if stop < FAKE_REVIEWS_PER_APP else None
+    return result, _ContinuationToken(token, lang, country, sort, count, filter_score_with, filter_device_with)
+
+
+def will_resume(output_file):
+    """True if a run on `output_file` would resume an interrupted run's checkpoint."""
+    return Checkpoint(output_file).path.exists()
+
+
+def reviews_output_file(compression=None):
+    """Default raw reviews path for the given compression."""
+    return config.RAW_DIR / (config.REVIEWS_FILENAME + COMPRESSION_SUFFIXES[compression])
+
+
+def _json_encoder(fast_json):
+    if fast_json:
+        try:
+            import orjson
+        except ImportError:
+            logger.debug("orjson is not installed, falling back to the json module.")
+        else:
+            # Datetimes go through default=str like json.dumps, so 'at' keeps its format
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+            return lambda record: orjson.dumps(record, default=str, option=option)
+    return lambda record: (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+
+def _compressor(compression):
+    if compression is None:
+        return lambda data: data
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().compress
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class JsonlWriter:
+    """
+    Appends records as JSON lines through a single open file handle.
+
+    write() encodes a batch into an in-memory buffer; flush() writes the buffer with
+    one call and returns the file size, which is a safe point to truncate back to.
+    Every `fsync_every` flushes (and on close) the file is also fsynced. With gzip or
+    zstd compression each flush is written as its own gzip member / zstd frame, so
+    the file stays readable when cut at any offset flush() returned.
+    """
+
+    def __init__(self, path, compression=None, fsync_every=FSYNC_EVERY, fast_json=True):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self._encode = _json_encoder(fast_json)
+        self._compress = _compressor(compression)
+        self._buffer = []
+        self._flushes = 0
+        self._file = open(self.path, "ab")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def write(self, records):
+        self._buffer.extend(self._encode(record) for record in records)
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._compress(b"".join(self._buffer)))
+            self._buffer = []
+        self._file.flush()
+        self._flushes += 1
+        if self.fsync_every and self._flushes % self.fsync_every == 0:
+            os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def _ingest_app(app_id, writer, checkpoint, fetch, watermarks, incremental=False,
+                limiter=None, write_lock=None, tag_app_id=False, on_reviews=None):
+    """
+    Fetches one app's remaining pages, appending each one and checkpointing it.
+    In incremental mode only reviews newer than the app's watermark are kept, and
+    paging stops at the first page that reaches it. The watermark moves to the newest
+    review of this run once the app finishes. `on_reviews(reviews)` is called with
+    each page once it is written, in file order.
+    Returns True if the app finished, False if it failed (its checkpoint is kept).
+    """
+    state = checkpoint.app_state(app_id)
+    state.setdefault("newest", None)
+    if state["pages"] and state["continuation_token"] is None:
+        # The last recorded page was the final one; only mark_done was missed
+        state["done"] = True
+    if state["done"]:
+        logger.info(f"[{app_id}] Already complete in checkpoint, skipping.")
+        return True
+    if state["pages"]:
+        logger.info(f"[{app_id}] Resuming after page {state['pages']} ({state['reviews']} reviews already saved)")
+    write_lock = write_lock or threading.Lock()
+    watermark = watermarks.get(app_id) if incremental else None
+
+    def on_page(result, continuation_token):
+        if state["newest"] is None:
+            # Pages are sorted newest first
+            state["newest"] = {"at": str(result[0].get("at")), "reviewId": result[0].get("reviewId")}
+        reached_watermark = False
+        if watermark is not None:
+            new_reviews = [review for review in result if Watermarks.is_newer(review, watermark)]
+            reached_watermark = len(new_reviews) < len(result)
+            result = new_reviews
+        # Append each review as a JSON line (JSONL format)
+        # Flushing every page (before checkpointing it) prevents data loss on a crash
+        if tag_app_id:
+            result = [dict(review, app_id=app_id) for review in result]
+        with write_lock:
+            writer.write(result)
+            offset = writer.flush()
+            checkpoint.record_page(app_id, continuation_token, len(result), offset)
+            if on_reviews is not None:
+                on_reviews(result)
+        return not reached_watermark
+
+    try:
+        fetch_pages(app_id, on_page, fetch=fetch, limiter=limiter,
+                    continuation_token=checkpoint.token(app_id), start_page=state["pages"])
+    except Exception as e:
+        logger.error(f"Failed to ingest reviews for {app_id} at page {state['pages'] + 1}: {e}")
+        logger.info(f"[{app_id}] Partial data saved: {state['reviews']} reviews written before failure. "
+                    f"Re-run to resume from the checkpoint.")
+        return False
+
+    with write_lock:
+        if state["newest"] is not None:
+            watermarks.update(app_id, state["newest"])
+        checkpoint.mark_done(app_id)
+    if watermark is not None:
+        logger.info(f"[{app_id}] {state['reviews']} new reviews since {watermark['at']}")
+    return True
+
+
+def run(output_file=None, fetch=None, resume=True, incremental=False, compression=None, on_reviews=None):
     """
     Fetches raw reviews using pagination and saves them as JSONL (one JSON object per line).
     Uses an append strategy to prevent data loss if the script crashes mid-way.
+    If a previous run was interrupted, it resumes from its checkpoint unless `resume` is False.
+    With `incremental`, only reviews newer than the last run are fetched and appended
+    to the existing file instead of replacing it. `compression` ("gzip" or "zstd")
+    compresses the output. `on_reviews` receives every written page (see _ingest_app).
+    Returns the number of reviews written.
     """
     if output_file is None:
-        output_file = config.RAW_DIR / config.REVIEWS_FILENAME
+        output_file = reviews_output_file(compression)
 
     app_id = config.TARGET_APP_ID
     logger.info(f"Fetching reviews for app: {app_id}")
 
     config.RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Clear the file at the start of a fresh run
-    with open(output_file, "w", encoding="utf-8") as f:
-        pass  # Truncate the file
+    # Clear the file at the start of a fresh run, or cut it back to the last checkpoint
+    checkpoint = Checkpoint.load(output_file, resume=resume, append=incremental)
+    checkpoint.start()
+    watermarks = Watermarks(output_file)
 
-    continuation_token = None
-    total_fetched = 0
+    with JsonlWriter(output_file, compression=compression) as writer:
+        finished = _ingest_app(app_id, writer, checkpoint, fetch, watermarks, incremental=incremental,
+                               on_reviews=on_reviews)
+    written = checkpoint.app_state(app_id)['reviews']
+    instrument.record_rows(rows_out=written)
+    if finished:
+        checkpoint.clear()
+        logger.info(f"Completed! Saved {written} reviews to {output_file}")
+    return written
 
-    try:
-        for page in range(MAX_PAGES):
-            logger.info(f"Fetching page {page + 1}/{MAX_PAGES}...")
-
-            result, continuation_token = reviews(
-                app_id,
-                lang='en',
-                country='us',
-                sort=Sort.NEWEST,
-                count=REVIEWS_PER_PAGE,
-                continuation_token=continuation_token
-            )
-
-            if not result:
-                logger.info("No more reviews to fetch.")
-                break
-
-            # Append each review as a JSON line (JSONL format)
-            # This "write with append in the loop" strategy prevents data loss
-            with open(output_file, "a", encoding="utf-8") as f:
-                for review in result:
-                    f.write(json.dumps(review, default=str) + "\n")
-
-            total_fetched += len(result)
-            logger.info(f"Appended {len(result)} reviews (total: {total_fetched})")
-
-            # Stop if no more pages
-            if continuation_token is None:
-                logger.info("Reached end of reviews.")
-                break
-
-        logger.info(f"Completed! Saved {total_fetched} reviews to {output_file}")
 
-    except Exception as e:
-        logger.error(f"Failed to ingest reviews at page {page + 1}: {e}")
-        logger.info(f"Partial data saved: {total_fetched} reviews written before failure.")
+def run_many(app_ids=None, output_file=None, fetch=None, resume=True, incremental=False,
+             compression=None, max_workers=MAX_WORKERS, max_requests_per_second=MAX_REQUESTS_PER_SECOND,
+             on_reviews=None, limiter=None):
+    """
+    Fetches the reviews of several apps concurrently into one shared JSONL file.
+    Each app pages with its own continuation token on a bounded thread pool, all
+    requests share one rate limiter (`limiter`, or a new one allowing
+    `max_requests_per_second`), and every review is tagged with its 'app_id'.
+    Interrupted runs resume from their checkpoint unless `resume` is False, and
+    `incremental`, `compression` and `on_reviews` work as in run().
+    Returns a dict of app_id -> number of reviews written.
+    """
+    if app_ids is None:
+        app_ids = config.TARGET_APP_IDS
+    if output_file is None:
+        output_file = reviews_output_file(compression)
+
+    config.RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Clear the file at the start of a fresh run, or cut it back to the last checkpoint
+    checkpoint = Checkpoint.load(output_file, resume=resume, append=incremental)
+    checkpoint.start()
+    watermarks = Watermarks(output_file)
+
+    if limiter is None:
+        limiter = RateLimiter(max_requests_per_second)
+    write_lock = threading.Lock()
+    for app_id in app_ids:
+        checkpoint.app_state(app_id)  # register every app before workers start saving
+
+    logger.info(f"Fetching reviews for {len(app_ids)} apps with {max_workers} workers")
+    with JsonlWriter(output_file, compression=compression) as writer:
+        def ingest_app(app_id):
+            return _ingest_app(app_id, writer, checkpoint, fetch, watermarks, incremental=incremental,
+                               limiter=limiter, write_lock=write_lock, tag_app_id=True, on_reviews=on_reviews)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            finished = list(pool.map(ingest_app, app_ids))
+
+    written = {app_id: checkpoint.app_state(app_id)["reviews"] for app_id in app_ids}
+    instrument.record_rows(rows_out=sum(written.values()))
+    if all(finished):
+        checkpoint.clear()
+        logger.info(f"Completed! Saved {sum(written.values())} reviews from {len(app_ids)} apps to {output_file}")
+    else:
+        logger.info(f"{finished.count(False)} apps failed; re-run to resume them from {checkpoint.path}")
+    return written
 
 
 if __name__ == "__main__":
@@ -0,0 +1,278 @@
+import cProfile
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from src import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Run reports (JSON) and per-stage cProfile dumps
+REPORTS_DIR = config.DATA_DIR / "reports"
+
+# Linux exposes the resident-set high-water mark and lets a process reset it, which
+# gives a true per-step peak; elsewhere peaks fall back to the process-wide maximum
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+# Number of slowest imports listed by profile_imports()
+IMPORT_TIMES_TOP = 15
+
+# RunReport being recorded, if any (instrumented code is a no-op otherwise)
+_active = None
+
+
+def _recording():
+    # Only the thread that activated the report records into it; the step tree is
+    # not shared with worker threads (their caller's step measures them)
+    report = _active
+    if report is None or report._thread != threading.get_ident():
+        return None
+    return report
+
+
+def _peak_rss_kb():
+    try:
+        with open(_PROC_STATUS, "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss():
+    try:
+        with open(_PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class Step:
+    """
+    Measurements of one pipeline stage or sub-step: wall and CPU time, peak RSS of
+    the process while it ran (worker processes are not included), rows in and out,
+    and its own sub-steps. An accumulating step sums these over its `calls`.
+    """
+
+    def __init__(self, name, accumulate=False):
+        self.name = name
+        self.accumulate = accumulate
+        self.calls = 0
+        self.wall_s = None
+        self.cpu_s = None
+        self.peak_kb = 0
+        self.rows_in = None
+        self.rows_out = None
+        self.error = None
+        self.profile = None
+        self.steps = []
+
+    def add_rows(self, rows_in=None, rows_out=None):
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + int(rows_in)
+        if rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + int(rows_out)
+
+    def to_dict(self):
+        record = {
+            "name": self.name,
+            "wall_s": round(self.wall_s, 6) if self.wall_s is not None else None,
+            "cpu_s": round(self.cpu_s, 6) if self.cpu_s is not None else None,
+            "peak_rss_mb": round(self.peak_kb / 1024, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+        if self.calls > 1:
+            record["calls"] = self.calls
+        if self.error is not None:
+            record["error"] = self.error
+        if self.profile is not None:
+            record["profile"] = self.profile
+        if self.steps:
+            record["steps"] = [step.to_dict() for step in self.steps]
+        return record
+
+
+class _NullStep:
+    """Stand-in yielded by step() when no report is being recorded."""
+
+    def add_rows(self, rows_in=None, rows_out=None):
+        pass
+
+
+_NULL_STEP = _NullStep()
+
+
+class RunReport:
+    """
+    Records a tree of timed steps for one pipeline run and writes it as JSON to
+    REPORTS_DIR. Use it as a context manager to make it the active report; with
+    `profile`, every top-level stage is also run under cProfile and dumped next to it.
+    """
+
+    def __init__(self, profile=False, output_dir=None, run_id=None):
+        self.profile = profile
+        self.output_dir = Path(output_dir) if output_dir else REPORTS_DIR
+        self.run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.root = Step("pipeline")
+        self.current = self.root
+        self.path = None
+        self._started_at = None
+        self._thread = None
+
+    def __enter__(self):
+        global _active
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        _reset_peak_rss()
+        self._thread = threading.get_ident()
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        _active = None
+        self.root.wall_s = time.perf_counter() - self._wall
+        self.root.cpu_s = time.process_time() - self._cpu
+        self.root.peak_kb = max(self.root.peak_kb, _peak_rss_kb())
+        if exc is not None:
+            self.root.error = repr(exc)
+        self.write()
+        return False
+
+    @contextmanager
+    def step(self, name, accumulate=False):
+        parent = self.current
+        # Repeated calls of an accumulating step (and every step nested in it) fold into
+        # one node per name; the high-water mark is only reset on its first call, so its
+        # peak is the highest seen since then
+        accumulate = accumulate or parent.accumulate
+        step = next((s for s in parent.steps if s.name == name), None) if accumulate else None
+        first_call = step is None
+        if first_call:
+            step = Step(name, accumulate)
+            parent.steps.append(step)
+        step.calls += 1
+        # Fold the parent's peak so far before resetting the high-water mark for this step
+        parent.peak_kb = max(parent.peak_kb, _peak_rss_kb())
+        if first_call:
+            _reset_peak_rss()
+        profiler = cProfile.Profile() if self.profile and parent is self.root else None
+        self.current = step
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield step
+        except BaseException as e:
+            step.error = repr(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            step.wall_s = (step.wall_s or 0.0) + time.perf_counter() - wall
+            step.cpu_s = (step.cpu_s or 0.0) + time.process_time() - cpu
+            step.peak_kb = max(step.peak_kb, _peak_rss_kb())
+            parent.peak_kb = max(parent.peak_kb, step.peak_kb)
+            self.current = parent
+            if profiler is not None:
+                path = self.output_dir / f"run_{self.run_id}_{name}.prof"
+                profiler.dump_stats(path)
+                step.profile = str(path)
+
+    def write(self):
+        """Writes the report as JSON and logs a one-line summary per stage."""
+        self.path = self.output_dir / f"run_{self.run_id}.json"
+        report = {
+            "run_id": self.run_id,
+            "started_at": self._started_at,
+            "pid": os.getpid(),
+            **self.root.to_dict(),
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, self.path)
+        for stage in self.root.steps:
+            logger.info(
+                f"{stage.name}: {stage.wall_s:.3f}s wall, {stage.cpu_s:.3f}s CPU, "
+                f"{stage.peak_kb / 1024:.0f} MB peak RSS, rows {stage.rows_in} -> {stage.rows_out}"
+            )
+        logger.info(f"Saved run report: {self.path}")
+
+
+@contextmanager
+def step(name, accumulate=False):
+    """
+    Times a block as a step of the active report, nested under the enclosing step.
+    Yields the step so callers can record row counts with `add_rows`. With
+    `accumulate`, repeated calls (e.g. once per chunk) add up in a single step.
+    Does nothing when no report is active, or when called from another thread than
+    the one running the pipeline (worker threads are measured by their caller's step).
+    """
+    report = _recording()
+    if report is None:
+        yield _NULL_STEP
+        return
+    with report.step(name, accumulate) as s:
+        yield s
+
+
+def record_rows(rows_in=None, rows_out=None):
+    """Adds row counts to the innermost active step (no-op without an active report)."""
+    report = _recording()
+    if report is not None:
+        report.current.add_rows(rows_in, rows_out)
+
+
+def parse_import_times(lines):
+    """
+    Parses `python -X importtime` output into (module, self_us, cumulative_us, depth)
+    tuples. Depth 0 are imports made by the program itself rather than by another module.
+    """
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip("\n")[1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        imports.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return imports
+
+
+def profile_imports(args, top=IMPORT_TIMES_TOP):
+    """
+    Runs `python -X importtime <args>` in a subprocess, passing its other output through,
+    then logs the total import time and the `top` slowest imports made by the program
+    itself (with everything they pulled in). Returns the subprocess' exit code.
+    """
+    lines = []
+    with subprocess.Popen([sys.executable, "-X", "importtime", *args], stderr=subprocess.PIPE, text=True) as proc:
+        for line in proc.stderr:
+            if line.startswith("import time:"):
+                lines.append(line)
+            else:
+                sys.stderr.write(line)
+    imports = [entry for entry in parse_import_times(lines) if entry[3] == 0]
+    total_us = sum(entry[2] for entry in imports)
+    logger.info(f"Imports: {total_us / 1e6:.3f}s over {len(imports)} top-level modules")
+    for name, self_us, cumulative_us, _ in sorted(imports, key=lambda entry: -entry[2])[:top]:
+        logger.info(f"  {cumulative_us / 1e3:9.1f} ms  (self {self_us / 1e3:7.1f} ms)  {name}")
+    return proc.returncode
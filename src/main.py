@@ -1,58 +1,320 @@
 import argparse
+import queue
 import sys
-from src import config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from src import config, dashboard_files, instrument, stages, storage
 
-def run_pipeline(reviews_input=None, apps_input=None):
+# Review pages buffered between the ingestion thread and a transform consuming them
+PAGE_QUEUE_SIZE = 64
+
+
+class PageStream:
     """
-    Main pipeline orchestration.
+    Bounded hand-off of review pages from the ingestion thread to the transform.
+    Iterating yields pages until the producer closes the stream; when full, the
+    producer waits. cancel() unblocks and silences the producer if the consumer fails.
     """
-    print("--- Starting Pipeline ---")
-    
-    # --- Step 2: Ingestion ---
-    # Determine input sources:
-    # If paths are provided via CLI, use them (Stress Test Mode). 
-    # If not, run scraping scripts and use their default outputs.
-    
-    apps_source = apps_input
-    reviews_source = reviews_input
-    
-    if not apps_source:
-        print("Scraping Mode: Fetching fresh app data...")
-        from src import ingest_apps
-        ingest_apps.run()
-        apps_source = config.RAW_DIR / config.APPS_FILENAME
-    else:
-        print(f"Stress Test Mode: Using provided apps input: {apps_source}")
-
-    if not reviews_source:
-        print("Scraping Mode: Fetching fresh reviews...")
-        from src import ingest_reviews
-        ingest_reviews.run()
-        reviews_source = config.RAW_DIR / config.REVIEWS_FILENAME
-    else:
-        print(f"Stress Test Mode: Using provided reviews input: {reviews_source}")
-        
-    # --- Step 3: Transformation ---
-    print(f"Transforming data from:\n  Apps: {apps_source}\n  Reviews: {reviews_source}")
+
+    def __init__(self, max_pages=PAGE_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max_pages)
+        self._cancelled = threading.Event()
+
+    def put(self, page):
+        if not self._cancelled.is_set():
+            self._queue.put(page)
+
+    def close(self):
+        self.put(None)
+
+    def cancel(self):
+        self._cancelled.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def __iter__(self):
+        return iter(self._queue.get, None)
+
+
+def _ingest_reviews(app_ids, incremental, compression, pages=None, fake=False, limiter=None):
+    from src import ingest_reviews
+    on_reviews = pages.put if pages is not None else None
+    fetch = ingest_reviews.fake_reviews if fake else None
+    try:
+        # Runs on a pool thread, where rows can't be recorded; the caller records the returned count
+        if app_ids:
+            written = ingest_reviews.run_many(app_ids, fetch=fetch, incremental=incremental, compression=compression,
+                                              on_reviews=on_reviews, limiter=limiter)
+            return sum(written.values())
+        return ingest_reviews.run(fetch=fetch, incremental=incremental, compression=compression, on_reviews=on_reviews)
+    finally:
+        if pages is not None:
+            pages.close()
+
+
+# Stage modules (and pandas, matplotlib, the scraper) are imported only by the stage
+# that runs them, so single-stage commands and skipped stages start fast
+def _transform(**kwargs):
     from src import transform
-    transform.run(apps_input=apps_source, reviews_input=reviews_source)
+    transform.run(**kwargs)
+
 
-    # --- Step 4: Serving ---
-    print("Generating Serving Layer outputs...")
+def _serve(**kwargs):
     from src import serve
-    serve.run()
+    serve.run(**kwargs)
 
-    # --- Step 5: Dashboard ---
-    print("Updating Dashboard...")
+
+def _dashboard(**kwargs):
     from src import dashboard
-    dashboard.run()
+    dashboard.run(**kwargs)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run the end-to-end data pipeline")
-    parser.add_argument("--reviews_input", help="Path to raw reviews file (overrides default scraping)")
-    parser.add_argument("--apps_input", help="Path to raw apps file (overrides default scraping)")
-    
-    args = parser.parse_args()
+def _dashboard_interactive():
+    from src import dashboard
+    dashboard.run_interactive()
+
+
+def _app_pages(**kwargs):
+    from src import dashboard
+    dashboard.run_app_pages(**kwargs)
+
+
+# Pipeline stages in run order (each is also a CLI subcommand; "all" runs every one)
+STAGES = ("ingest", "transform", "serve", "dashboard")
+
+
+def run_pipeline(reviews_input=None, apps_input=None, chunksize=None, output_format=None, app_ids=None, incremental=False, compression=None, incremental_serving=False, serving_backend=None, dashboard_sinks=None, rebuild_dashboard=False, dashboard_mode="static", app_pages=False, report=False, profile=False, force=False, transform_workers=None, dedup_index=False, fake_reviews=False, run_stages=STAGES):
+    """
+    Main pipeline orchestration. With `report`, each stage and its key sub-steps are
+    timed and written to a JSON run report (see src/instrument.py); `profile` also
+    dumps a cProfile file per stage. Stages whose inputs, parameters and code are
+    unchanged since their last run are skipped unless `force` is set. `run_stages`
+    limits the run to some of STAGES; later stages then read the files left by
+    earlier runs. `fake_reviews` pages reviews from ingest_reviews.fake_reviews, an
+    offline stand-in of the Play Store, instead of scraping them.
+    """
+    print("--- Starting Pipeline ---")
+    run_report = instrument.RunReport(profile=profile) if (report or profile) else nullcontext()
     
-    run_pipeline(reviews_input=args.reviews_input, apps_input=args.apps_input)
+    with run_report:
+        # --- Step 2: Ingestion ---
+        # Determine input sources:
+        # If paths are provided via CLI, use them (Stress Test Mode). 
+        # If not, run scraping scripts (or reuse their last outputs) and use their default outputs.
+        
+        apps_source = apps_input
+        reviews_source = reviews_input
+        apps_future = reviews_future = review_pages = limiter = None
+        scrape = "ingest" in run_stages
+
+        # Stages after ingestion are skipped when their inputs, parameters and code
+        # are unchanged since their last run (see src/stages.py)
+        state = stages.StageState()
+        output_format = output_format or config.PROCESSED_FORMAT
+
+        # Apps and reviews are independent network-bound fetches, so they run concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            try:
+                if scrape and app_ids:
+                    # App metadata and review requests hit the same store, so they share one rate limit
+                    from src import ingest_reviews
+                    limiter = ingest_reviews.RateLimiter(ingest_reviews.MAX_REQUESTS_PER_SECOND)
+
+                if not apps_source:
+                    apps_source = config.RAW_DIR / config.APPS_FILENAME
+                    if scrape:
+                        print("Scraping Mode: Fetching fresh app data...")
+                        from src import ingest_apps
+                        apps_future = pool.submit(ingest_apps.run, app_ids=app_ids, limiter=limiter)
+                else:
+                    print(f"Stress Test Mode: Using provided apps input: {apps_source}")
+
+                if not reviews_source:
+                    from src import ingest_reviews
+                    reviews_source = ingest_reviews.reviews_output_file(compression)
+                    if scrape:
+                        print("Scraping Mode: Fetching fresh reviews...")
+                        # When streaming into a fresh raw file, the transform consumes pages while later
+                        # ones are still being fetched (resumed or incremental runs also hold older reviews)
+                        if chunksize and "transform" in run_stages and not incremental and not ingest_reviews.will_resume(reviews_source):
+                            review_pages = PageStream()
+                        reviews_future = pool.submit(_ingest_reviews, app_ids, incremental, compression, review_pages, fake_reviews, limiter)
+                else:
+                    print(f"Stress Test Mode: Using provided reviews input: {reviews_source}")
+
+                if scrape:
+                    with instrument.step("ingest") as ingest_step:
+                        # The transform needs the whole catalog before joining any review
+                        if apps_future is not None:
+                            apps_future.result()
+                        if reviews_future is not None and review_pages is None:
+                            ingest_step.add_rows(rows_out=reviews_future.result())
+
+                # --- Step 3: Transformation ---
+                if "transform" in run_stages:
+                    print(f"Transforming data from:\n  Apps: {apps_source}\n  Reviews: {reviews_source}")
+                    transform_stage = dict(
+                        inputs=[apps_source, reviews_source],
+                        outputs=[storage.processed_path(name, output_format) for name in ("apps_catalog", "apps_reviews")],
+                        params={"chunksize": chunksize, "output_format": output_format,
+                                "workers": transform_workers or config.TRANSFORM_WORKERS, "dedup_index": dedup_index},
+                        code=stages.code_version(["src.transform", "src.storage", "src.config"]),
+                    )
+                    with instrument.step("transform"):
+                        if review_pages is not None:
+                            print("Transforming reviews as pages arrive...")
+                            from src import transform
+                            transform.run(apps_input=apps_source, reviews_input=reviews_source, chunksize=chunksize,
+                                          output_format=output_format, workers=transform_workers,
+                                          dedup_index=dedup_index, review_chunks=transform.chunks_from_pages(review_pages, chunksize))
+                            # Streamed reviews finish during the transform but are counted by the ingest step
+                            ingest_step.add_rows(rows_out=reviews_future.result())
+                            state.record("transform", **transform_stage)
+                        else:
+                            state.run(
+                                "transform",
+                                lambda: _transform(apps_input=apps_source, reviews_input=reviews_source, chunksize=chunksize, output_format=output_format, workers=transform_workers, dedup_index=dedup_index),
+                                force=force,
+                                **transform_stage,
+                            )
+            except BaseException:
+                # Unblock the reviews thread if it is waiting on a full page queue, otherwise
+                # leaving the pool block would wait on it forever
+                if review_pages is not None:
+                    review_pages.cancel()
+                raise
+
+        # --- Step 4: Serving ---
+        if "serve" in run_stages:
+            print("Generating Serving Layer outputs...")
+            with instrument.step("serve"):
+                state.run(
+                    "serve",
+                    lambda: _serve(output_format=output_format, incremental=incremental_serving, backend=serving_backend),
+                    inputs=[p for p in [storage.find_processed("apps_reviews")] if p is not None],
+                    outputs=[storage.processed_path(name, output_format) for name in ("app_kpis", "daily_metrics")],
+                    params={"output_format": output_format, "backend": serving_backend or config.SERVING_BACKEND},
+                    code=stages.code_version(["src.serve", "src.storage", "src.config"]),
+                    # Incremental serving folds every batch into its persistent state
+                    force=force or incremental_serving,
+                )
+
+        # --- Step 5: Dashboard ---
+        if "dashboard" in run_stages:
+            print("Updating Dashboard...")
+            dashboard_inputs = [p for p in map(storage.find_processed, ("daily_metrics", "apps_reviews", "app_kpis")) if p is not None]
+            dashboard_code = stages.code_version(["src.dashboard", "src.dashboard_files", "src.storage", "src.config"])
+            with instrument.step("dashboard"):
+                if dashboard_mode == "interactive":
+                    state.run(
+                        "dashboard_interactive",
+                        _dashboard_interactive,
+                        inputs=dashboard_inputs,
+                        outputs=[config.PROCESSED_DIR / "dashboard_interactive.html"],
+                        params={},
+                        code=dashboard_code,
+                        force=force,
+                    )
+                else:
+                    sinks = dashboard_sinks or config.DASHBOARD_SINKS
+                    state.run(
+                        "dashboard",
+                        lambda: _dashboard(sinks=sinks, force=rebuild_dashboard),
+                        inputs=dashboard_inputs,
+                        outputs=dashboard_files.output_files(sinks),
+                        params={"sinks": sinks},
+                        code=dashboard_code,
+                        force=force or rebuild_dashboard,
+                    )
+            if app_pages:
+                with instrument.step("app_pages"):
+                    state.run(
+                        "app_pages",
+                        lambda: _app_pages(force=rebuild_dashboard),
+                        inputs=dashboard_inputs,
+                        outputs=[config.PROCESSED_DIR / dashboard_files.APP_PAGES_DIRNAME / "index.html"],
+                        params={},
+                        code=dashboard_code,
+                        force=force or rebuild_dashboard,
+                    )
+
+
+def build_parser():
+    """
+    CLI with one subcommand per stage plus "all". Options are grouped by the stage that
+    uses them, and each subcommand only accepts the groups it needs.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--report", action="store_true", help="Record wall/CPU time, peak RSS and row counts per stage to data/reports/run_<timestamp>.json")
+    common.add_argument("--profile", action="store_true", help="Like --report, plus a cProfile dump per stage next to the report")
+    common.add_argument("--force", action="store_true", help="Re-run every stage even if its inputs, parameters and code are unchanged")
+    common.add_argument("--import_times", action="store_true", help="Run the command under `python -X importtime` and report the slowest imports")
+
+    ingest = argparse.ArgumentParser(add_help=False)
+    ingest.add_argument("--app_ids", help="Comma-separated app IDs to scrape concurrently (default: config.TARGET_APP_ID only)")
+    ingest.add_argument("--incremental", action="store_true", help="Only scrape reviews newer than the last run and append them to the raw file")
+    ingest.add_argument("--fake_reviews", action="store_true", help="Page reviews from a deterministic offline stand-in of the Play Store (for benchmarks; app metadata is still scraped)")
+
+    raw = argparse.ArgumentParser(add_help=False)
+    raw.add_argument("--compression", choices=["gzip", "zstd"], help="Compress scraped reviews (zstd needs the zstandard package)")
+
+    transform = argparse.ArgumentParser(add_help=False)
+    transform.add_argument("--reviews_input", help="Path to raw reviews file (overrides default scraping)")
+    transform.add_argument("--apps_input", help="Path to raw apps file (overrides default scraping)")
+    transform.add_argument("--chunksize", type=int, help="Stream raw reviews through the transform in chunks of this many rows")
+    transform.add_argument("--dedup_index", action="store_true", help="Drop reviews already written by earlier runs (tracked in data/processed/review_index.sqlite); pair with --incremental_serving")
+    transform.add_argument("--transform_workers", type=int, help="Normalize hash partitions of the reviews in this many processes (default: config.TRANSFORM_WORKERS)")
+
+    processed = argparse.ArgumentParser(add_help=False)
+    processed.add_argument("--output_format", choices=["csv", "parquet"], help="Processed layer format (default: config.PROCESSED_FORMAT)")
+
+    serve = argparse.ArgumentParser(add_help=False)
+    serve.add_argument("--incremental_serving", action="store_true", help="Fold this run's reviews into the persistent serving state instead of recomputing KPIs")
+    serve.add_argument("--serving_backend", choices=["pandas", "duckdb"], help="Engine computing app_kpis and daily_metrics (default: config.SERVING_BACKEND)")
+
+    dashboard = argparse.ArgumentParser(add_help=False)
+    dashboard.add_argument("--dashboard_sinks", help="Comma-separated chart outputs among inline,png,svg (default: config.DASHBOARD_SINKS)")
+    dashboard.add_argument("--dashboard_mode", choices=["static", "interactive"], default="static", help="Static matplotlib charts, or an interactive Plotly page rendered in the browser")
+    dashboard.add_argument("--app_pages", action="store_true", help="Also generate a drilldown page per app and an index page under data/processed/dashboard_apps/")
+    dashboard.add_argument("--rebuild_dashboard", action="store_true", help="Re-render every chart instead of reusing cached images of unchanged inputs")
+
+    parser = argparse.ArgumentParser(description="Run the end-to-end data pipeline, or one of its stages (default: all)")
+    commands = parser.add_subparsers(dest="command", metavar="{" + ",".join(STAGES + ("all",)) + "}")
+    commands.add_parser("ingest", parents=[common, ingest, raw], help="Scrape app metadata and reviews into data/raw/")
+    commands.add_parser("transform", parents=[common, raw, transform, processed], help="Clean and join the raw files into the processed layer")
+    commands.add_parser("serve", parents=[common, processed, serve], help="Compute app_kpis and daily_metrics")
+    commands.add_parser("dashboard", parents=[common, dashboard], help="Render the dashboard from the serving layer")
+    commands.add_parser("all", parents=[common, ingest, raw, transform, processed, serve, dashboard], help="Run every stage (default)")
+    return parser
+
+
+def parse_args(argv):
+    # A bare option list (the pre-subcommand CLI) means "all"
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["all"] + list(argv)
+    return build_parser().parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    if args.import_times:
+        return instrument.profile_imports(["-m", "src.main"] + [a for a in argv if a != "--import_times"])
+
+    options = vars(args)
+    command = options.pop("command")
+    options.pop("import_times")
+    if options.get("app_ids"):
+        options["app_ids"] = [app_id.strip() for app_id in options["app_ids"].split(",") if app_id.strip()]
+    if options.get("dashboard_sinks"):
+        options["dashboard_sinks"] = [sink.strip() for sink in options["dashboard_sinks"].split(",") if sink.strip()]
+    run_pipeline(run_stages=STAGES if command == "all" else (command,), **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,66 +1,446 @@
 import pandas as pd
+import numpy as np
 import logging
-from src import config
+import sqlite3
+from src import config, instrument, storage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def run():
+# Mergeable aggregate state for incremental serving (delete the file to rebuild it)
+SERVING_STATE_FILE = "serving_state.sqlite"
+
+# Per-review contribution kept in the state ledger, so a changed review can be retracted
+LEDGER_COLS = ['review_id', 'app_id', 'day', 'score', 'at']
+APP_SUM_COLS = ['n_reviews', 'n_rows', 'score_sum', 'score_n', 'low_n']
+DAY_SUM_COLS = ['n_reviews', 'n_rows', 'score_sum', 'score_n']
+
+# Ledger key prefix of reviews without a reviewId, keyed instead by a hash of their app,
+# time, author and text so that folding them again does not count them twice
+ANONYMOUS_KEY_PREFIX = 'anon:'
+
+
+def _ledger_keys(df, at):
+    keys = df['reviewId'].astype(str).where(df['reviewId'].notna()).astype(object)
+    missing = keys.isna()
+    if missing.any():
+        fields = pd.DataFrame({
+            'app_id': df.loc[missing, 'app_id'],
+            'at': at[missing],
+            'userName': df.loc[missing, 'userName'] if 'userName' in df.columns else None,
+            'content': df.loc[missing, 'content'] if 'content' in df.columns else None,
+        }).astype(str)
+        hashes = pd.util.hash_pandas_object(fields, index=False)
+        keys[missing] = ANONYMOUS_KEY_PREFIX + hashes.map('{:016x}'.format)
+    return keys
+
+
+def _contributions(df):
+    at = df['at'] if 'at' in df.columns else pd.Series(pd.NaT, index=df.index)
+    at_text = at.dt.strftime('%Y-%m-%d %H:%M:%S').astype(object)
+    return pd.DataFrame({
+        'review_id': _ledger_keys(df, at_text),
+        'app_id': df['app_id'].astype(object),
+        'day': at.dt.strftime('%Y-%m-%d').astype(object),
+        'score': pd.to_numeric(df['score'], errors='coerce'),
+        'at': at_text,
+    })
+
+
+def _sums(contrib, sign):
+    # An empty ledger read has object columns, which would turn the concatenated sums into objects
+    score = contrib['score'].astype(float)
+    return pd.DataFrame({
+        'app_id': contrib['app_id'],
+        'day': contrib['day'],
+        'n_reviews': sign * ~contrib['review_id'].astype(str).str.startswith(ANONYMOUS_KEY_PREFIX),
+        'n_rows': sign,
+        'score_sum': sign * score.fillna(0),
+        'score_n': sign * score.notna(),
+        'low_n': sign * (score <= 2),
+    })
+
+
+def _load_ledger(con, review_ids):
+    con.execute("CREATE TEMP TABLE IF NOT EXISTS batch_ids (review_id TEXT PRIMARY KEY)")
+    con.execute("DELETE FROM batch_ids")
+    con.executemany("INSERT OR IGNORE INTO batch_ids VALUES (?)", ((i,) for i in review_ids))
+    return pd.read_sql_query(
+        "SELECT l.* FROM ledger l JOIN batch_ids b ON l.review_id = b.review_id", con
+    )
+
+
+def _read_table(con, name, columns):
+    try:
+        return pd.read_sql_query(f"SELECT * FROM {name}", con)
+    except pd.errors.DatabaseError:
+        return pd.DataFrame(columns=columns)
+
+
+def fold_incremental(df, state_path=None):
+    """
+    Folds a batch of processed reviews into the persistent serving state and returns
+    (app_kpis, daily_metrics) for the whole history folded so far.
+
+    The state holds count, score sum, low-rating count and min/max 'at' per app, and
+    count and score sum per day, plus a ledger of each review's contribution. Only
+    reviews that are new or whose app/day/score/at changed touch the state; a changed
+    review's previous contribution is retracted first. Reviews without a reviewId are
+    keyed by a hash of their app, time, author and text (see _ledger_keys). First/most
+    recent review dates only ever widen (a retracted extreme is not shrunk back).
+    """
+    if state_path is None:
+        state_path = config.PROCESSED_DIR / SERVING_STATE_FILE
+    df = df.loc[:, ~df.columns.duplicated()]
+    batch = _contributions(df)
+
+    with sqlite3.connect(state_path) as con:
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS ledger "
+            "(review_id TEXT PRIMARY KEY, app_id TEXT, day TEXT, score REAL, at TEXT)"
+        )
+        old = _load_ledger(con, batch['review_id'].unique())
+
+        # Unchanged reviews (same contribution as already folded) are skipped
+        compared = batch.merge(old, on='review_id', how='left', suffixes=('', '_old'), indicator=True)
+        same = compared['_merge'].eq('both')
+        for col in LEDGER_COLS[1:]:
+            new_val, old_val = compared[col], compared[f'{col}_old']
+            same &= (new_val == old_val) | (new_val.isna() & old_val.isna())
+        added = batch[~same.to_numpy()]
+        retracted = old[old['review_id'].isin(added['review_id'])]
+        logger.info(f"Folding {len(added)} new/changed reviews ({len(retracted)} retracted, {int(same.sum())} unchanged)")
+
+        delta = pd.concat([_sums(added, 1), _sums(retracted, -1)], ignore_index=True)
+
+        # Per-app state
+        app_state = _read_table(con, 'app_state', ['app_id', 'app_name'] + APP_SUM_COLS + ['first_at', 'last_at'])
+        app_state = app_state.set_index('app_id')
+        app_delta = delta.dropna(subset=['app_id']).groupby('app_id')[APP_SUM_COLS].sum()
+        app_dates = pd.to_datetime(added['at']).groupby(added['app_id']).agg(['min', 'max'])
+        app_names = df.dropna(subset=['app_id']).groupby('app_id')['app_name'].first() if 'app_name' in df.columns else None
+        app_state = app_state.reindex(app_state.index.union(app_delta.index))
+        app_state[APP_SUM_COLS] = app_state[APP_SUM_COLS].fillna(0).add(app_delta, fill_value=0)
+        app_state['first_at'] = pd.concat([pd.to_datetime(app_state['first_at']), app_dates['min']], axis=1).min(axis=1)
+        app_state['last_at'] = pd.concat([pd.to_datetime(app_state['last_at']), app_dates['max']], axis=1).max(axis=1)
+        if app_names is not None:
+            app_state['app_name'] = app_state['app_name'].fillna(app_names)
+        app_state = app_state[app_state['n_rows'] > 0]
+
+        # Per-day state
+        day_state = _read_table(con, 'day_state', ['day'] + DAY_SUM_COLS).set_index('day')
+        day_delta = delta.dropna(subset=['day']).groupby('day')[DAY_SUM_COLS].sum()
+        day_state = day_state.reindex(day_state.index.union(day_delta.index))
+        day_state[DAY_SUM_COLS] = day_state[DAY_SUM_COLS].fillna(0).add(day_delta, fill_value=0)
+        day_state = day_state[day_state['n_rows'] > 0]
+
+        app_state.reset_index(names='app_id').to_sql('app_state', con, if_exists='replace', index=False)
+        day_state.reset_index(names='day').to_sql('day_state', con, if_exists='replace', index=False)
+        ledger_rows = added.astype(object).where(added.notna(), None)
+        con.executemany("INSERT OR REPLACE INTO ledger VALUES (?, ?, ?, ?, ?)", ledger_rows.itertuples(index=False, name=None))
+
+    kpis = pd.DataFrame({
+        'app_id': app_state.index,
+        'app_name': app_state['app_name'].to_numpy(),
+        'number_of_reviews': app_state['n_reviews'].astype(int).to_numpy(),
+        'average_rating': (app_state['score_sum'] / app_state['score_n'].where(app_state['score_n'] > 0)).to_numpy(),
+        'pct_low_rating_reviews': (app_state['low_n'] / app_state['n_rows'] * 100).to_numpy(),
+        'first_review_date': pd.to_datetime(app_state['first_at']).to_numpy(),
+        'most_recent_review_date': pd.to_datetime(app_state['last_at']).to_numpy(),
+    })
+    daily_metrics = pd.DataFrame({
+        'date': pd.to_datetime(day_state.index).date,
+        'daily_number_of_reviews': day_state['n_reviews'].astype(int).to_numpy(),
+        'daily_average_rating': (day_state['score_sum'] / day_state['score_n'].where(day_state['score_n'] > 0)).to_numpy(),
+    })
+    return kpis, daily_metrics
+
+
+# Per-review indicator columns the KPIs aggregate, built column-wise before grouping
+KPI_INPUTS = {
+    'is_low_rating': lambda df: (df['score'] <= 2).astype(float),
+}
+
+# Output column -> (input column, built-in pandas reduction). Only built-in reductions
+# ('count', 'sum', 'mean', 'median', 'min', 'max', 'first', ...) so that groupby stays
+# on its vectorized path. Rates are means of a KPI_INPUTS indicator; ratio KPIs can be
+# two 'sum' KPIs divided afterwards.
+APP_KPIS = {
+    'app_name': ('app_name', 'first'),  # Just take the first name found
+    'number_of_reviews': ('reviewId', 'count'),
+    'average_rating': ('score', 'mean'),
+    'pct_low_rating_reviews': ('is_low_rating', 'mean'),
+    'first_review_date': ('at', 'min'),
+    'most_recent_review_date': ('at', 'max'),
+}
+
+# KPIs reported as percentages of their aggregated value
+APP_KPI_SCALE = {
+    'pct_low_rating_reviews': 100,
+}
+
+
+def compute_app_kpis(df):
+    """
+    Aggregates APP_KPIS per app in a single groupby pass.
+    """
+    inputs = {name: build(df) for name, build in KPI_INPUTS.items()}
+    specs = {name: spec for name, spec in APP_KPIS.items() if spec[0] in df.columns or spec[0] in inputs}
+
+    # 'first'/'last' on text columns is slow; take them on integer codes and decode after
+    labels = {}
+    for name, (col, func) in specs.items():
+        if func in ('first', 'last') and col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            codes, uniques = pd.factorize(df[col])
+            inputs[f'_{col}_code'] = pd.Series(codes, index=df.index).where(codes >= 0)
+            specs[name] = (f'_{col}_code', func)
+            labels[name] = uniques
+
+    kpis = df.assign(**inputs).groupby('app_id').agg(**specs)
+    for name, uniques in labels.items():
+        codes = kpis[name].fillna(-1).astype(int).to_numpy()
+        kpis[name] = uniques.take(codes, allow_fill=True, fill_value=np.nan)
+    for name, scale in APP_KPI_SCALE.items():
+        if name in kpis.columns:
+            kpis[name] = kpis[name] * scale
+    return kpis.reset_index()
+
+
+# SQL counterparts of KPI_INPUTS and of the built-in reductions used by APP_KPIS (DuckDB backend)
+KPI_INPUTS_SQL = {
+    'is_low_rating': "CASE WHEN score <= 2 THEN 1.0 ELSE 0.0 END",
+}
+
+SQL_REDUCTIONS = {
+    'count': "count({col})",
+    'sum': "sum({col})",
+    'mean': "avg({col})",
+    'median': "median({col})",
+    'min': "min({col})",
+    'max': "max({col})",
+    # first/last non-null value in file order, like pandas
+    'first': "arg_min({col}, _row) FILTER (WHERE {col} IS NOT NULL)",
+    'last': "arg_max({col}, _row) FILTER (WHERE {col} IS NOT NULL)",
+}
+
+# Processed review columns the serving queries read, and the type each is cast to
+SERVING_COL_TYPES = {
+    'app_id': 'VARCHAR',
+    'app_name': 'VARCHAR',
+    'reviewId': 'VARCHAR',
+    'score': 'DOUBLE',
+    'at': 'TIMESTAMP',
+}
+
+
+def _check_sql_kpis():
+    # KPIs are only dropped when their input is missing from the file, as in pandas; a
+    # registered KPI without a SQL counterpart must not vanish from the DuckDB output
+    untranslatable = [
+        name for name, (col, func) in APP_KPIS.items()
+        if (col not in SERVING_COL_TYPES and col not in KPI_INPUTS_SQL) or func not in SQL_REDUCTIONS
+    ]
+    if untranslatable:
+        raise ValueError(
+            f"APP_KPIS entries without a DuckDB translation: {untranslatable}. Add their input "
+            "column to SERVING_COL_TYPES or KPI_INPUTS_SQL and their reduction to SQL_REDUCTIONS."
+        )
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _duckdb_source(path, row_numbers=False):
+    # With `row_numbers`, Parquet scans also yield each row's position as file_row_number
+    if path.suffix == ".parquet":
+        return f"read_parquet({_literal(path)}{', file_row_number = true' if row_numbers else ''})"
+    # Read CSV as text and cast below, so type sniffing can never reject a dirty value
+    return f"read_csv({_literal(path)}, header = true, all_varchar = true)"
+
+
+def compute_serving_duckdb(path):
+    """
+    Runs the app KPI and daily metric aggregations in DuckDB directly over a processed
+    apps_reviews file. DuckDB scans and aggregates in parallel and spills to disk when the
+    data does not fit in memory. Returns (kpis, daily_metrics) with the same columns and
+    types as the pandas path; daily_metrics is None when there is no 'at' column.
+    Raises ValueError if an APP_KPIS entry cannot be translated to SQL.
+    """
+    import duckdb
+
+    _check_sql_kpis()
+    con = duckdb.connect()
+    try:
+        con.execute(f"SET temp_directory = {_literal(config.DATA_DIR / 'duckdb_tmp')}")
+        source = _duckdb_source(path)
+        file_types = {row[0]: row[1] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+
+        typed = []
+        for col, sql_type in SERVING_COL_TYPES.items():
+            if col not in file_types:
+                continue
+            if file_types[col].split('(')[0] == sql_type:
+                expr = _quote(col)
+            else:
+                expr = f"TRY_CAST(CAST({_quote(col)} AS VARCHAR) AS {sql_type})"
+            typed.append(f"{expr} AS {_quote(col)}")
+        columns = [col for col in SERVING_COL_TYPES if col in file_types]
+        inputs = {name: expr for name, expr in KPI_INPUTS_SQL.items() if 'score' in columns}
+
+        specs = {name: spec for name, spec in APP_KPIS.items() if spec[0] in columns or spec[0] in inputs}
+        aggs = ",\n                ".join(
+            f"{SQL_REDUCTIONS[func].format(col=_quote(col))} AS {_quote(name)}" for name, (col, func) in specs.items()
+        )
+        input_cols = "".join(f", {expr} AS {_quote(name)}" for name, expr in inputs.items())
+
+        def reviews(row_order=False):
+            # first/last need each row's file position (_row); CSV scans can only number
+            # rows with an order-preserving window, so only the queries using them pay for it
+            row, scan = "", source
+            if row_order and path.suffix == ".parquet":
+                row, scan = ", file_row_number AS _row", _duckdb_source(path, row_numbers=True)
+            elif row_order:
+                row = ", row_number() OVER () AS _row"
+            return f"""
+            WITH typed AS (
+                SELECT {', '.join(typed)}{row} FROM {scan}
+            ),
+            reviews AS (
+                SELECT *{input_cols} FROM typed
+            )"""
+
+        row_order = any(func in ('first', 'last') for _, func in specs.values())
+        kpis = con.execute(f"""{reviews(row_order)}
+            SELECT app_id,
+                {aggs}
+            FROM reviews
+            WHERE app_id IS NOT NULL
+            GROUP BY app_id
+            ORDER BY app_id
+        """).df()
+        for name, scale in APP_KPI_SCALE.items():
+            if name in kpis.columns:
+                kpis[name] = kpis[name] * scale
+
+        daily_metrics = None
+        if 'at' in columns:
+            daily_metrics = con.execute(f"""{reviews()}
+                SELECT CAST("at" AS DATE) AS date,
+                    count("reviewId") AS daily_number_of_reviews,
+                    avg(score) AS daily_average_rating
+                FROM reviews
+                WHERE "at" IS NOT NULL
+                GROUP BY 1
+                ORDER BY 1
+            """).df()
+            # pandas groups on datetime.date values
+            daily_metrics['date'] = daily_metrics['date'].dt.date
+    finally:
+        con.close()
+    return kpis, daily_metrics
+
+
+def run(output_format=None, incremental=False, backend=None):
+    """
+    Builds app_kpis and daily_metrics from the processed reviews. With `incremental`,
+    the processed reviews are treated as a new batch and folded into the persistent
+    serving state (see fold_incremental) instead of being aggregated from scratch.
+    `backend` ("pandas" or "duckdb", default config.SERVING_BACKEND) selects the engine
+    of full recomputations.
+    """
     logger.info("Starting Serving Layer...")
+    backend = backend or config.SERVING_BACKEND
+    if backend not in ("pandas", "duckdb"):
+        raise ValueError(f"Unsupported serving backend: {backend}")
     
-    # Input paths
-    reviews_path = config.PROCESSED_DIR / "apps_reviews.csv"
-    
-    if not reviews_path.exists():
-        logger.error(f"Input file not found: {reviews_path}. Transformation step might have failed.")
+    if backend == "duckdb" and not incremental:
+        path = storage.find_processed("apps_reviews")
+        if path is None:
+            logger.error(f"Input file not found: {storage.processed_path('apps_reviews')}. Transformation step might have failed.")
+            return
+        with instrument.step("duckdb_aggregate") as step:
+            kpis, daily_metrics = compute_serving_duckdb(path)
+            step.add_rows(rows_out=len(kpis))
+        with instrument.step("write[app_kpis]") as step:
+            kpis_out = storage.write_processed(kpis, "app_kpis", output_format)
+            step.add_rows(rows_in=len(kpis))
+        logger.info(f"Saved app KPIs: {kpis_out}")
+        instrument.record_rows(rows_out=len(kpis))
+        if daily_metrics is None:
+            logger.warning("No 'at' column found, skipping daily metrics.")
+            return
+        with instrument.step("write[daily_metrics]") as step:
+            daily_out = storage.write_processed(daily_metrics, "daily_metrics", output_format)
+            step.add_rows(rows_in=len(daily_metrics))
+        logger.info(f"Saved daily metrics: {daily_out}")
+        instrument.record_rows(rows_out=len(daily_metrics))
         return
-
-    # Load Data
-    df = pd.read_csv(reviews_path)
     
-    # Ensure date column is datetime (read_csv reads as object)
-    if 'at' in df.columns:
-        df['at'] = pd.to_datetime(df['at'])
+    # Load Data (whichever processed format transform wrote last)
+    with instrument.step("load[apps_reviews]") as step:
+        df = storage.read_processed("apps_reviews")
     
+        if df is None:
+            logger.error(f"Input file not found: {storage.processed_path('apps_reviews')}. Transformation step might have failed.")
+            return
+    
+        # Ensure date column is datetime (read_csv reads as object; Parquet is already typed)
+        if 'at' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['at']):
+            df['at'] = pd.to_datetime(df['at'])
+        step.add_rows(rows_out=len(df))
+    instrument.record_rows(rows_in=len(df))
+    
+    if incremental:
+        with instrument.step("fold_incremental") as step:
+            kpis, daily_metrics = fold_incremental(df)
+            step.add_rows(rows_in=len(df), rows_out=len(kpis) + len(daily_metrics))
+        kpis_out = storage.write_processed(kpis, "app_kpis", output_format)
+        logger.info(f"Saved app KPIs: {kpis_out}")
+        daily_out = storage.write_processed(daily_metrics, "daily_metrics", output_format)
+        logger.info(f"Saved daily metrics: {daily_out}")
+        instrument.record_rows(rows_out=len(kpis) + len(daily_metrics))
+        return
+
     # --- 1. App-Level KPIs ---
     # We want specific metrics per app (though often we only have 1 app)
     # number_of_reviews, average_rating, pct_low_rating_reviews (<=2), first_review, most_recent_review
+    with instrument.step("compute_app_kpis") as step:
+        kpis = compute_app_kpis(df)
+        step.add_rows(rows_in=len(df), rows_out=len(kpis))
     
-    # Helper for low rating pct
-    def pct_low_rating(scores):
-        if len(scores) == 0: return 0.0
-        return (scores <= 2).mean() * 100
-
-    kpis = df.groupby('app_id').agg(
-        app_name=('app_name', 'first'), # Just take the first name found
-        number_of_reviews=('reviewId', 'count'),
-        average_rating=('score', 'mean'),
-        pct_low_rating_reviews=('score', pct_low_rating),
-        first_review_date=('at', 'min'),
-        most_recent_review_date=('at', 'max')
-    ).reset_index()
-    
-    kpis_out = config.PROCESSED_DIR / "app_kpis.csv"
-    kpis.to_csv(kpis_out, index=False)
+    with instrument.step("write[app_kpis]") as step:
+        kpis_out = storage.write_processed(kpis, "app_kpis", output_format)
+        step.add_rows(rows_in=len(kpis))
     logger.info(f"Saved app KPIs: {kpis_out}")
+    instrument.record_rows(rows_out=len(kpis))
     
     # --- 2. Daily Metrics ---
     # date, daily_number_of_reviews, daily_average_rating
     
     # Group by Date (floor to day)
     if 'at' in df.columns:
-        df['date'] = df['at'].dt.date
+        with instrument.step("daily_metrics") as step:
+            df['date'] = df['at'].dt.date
+            
+            daily_metrics = df.groupby('date').agg(
+                daily_number_of_reviews=('reviewId', 'count'),
+                daily_average_rating=('score', 'mean')
+            ).sort_index().reset_index()
+            step.add_rows(rows_in=len(df), rows_out=len(daily_metrics))
         
-        daily_metrics = df.groupby('date').agg(
-            daily_number_of_reviews=('reviewId', 'count'),
-            daily_average_rating=('score', 'mean')
-        ).sort_index().reset_index()
-        
-        daily_out = config.PROCESSED_DIR / "daily_metrics.csv"
-        daily_metrics.to_csv(daily_out, index=False)
+        with instrument.step("write[daily_metrics]") as step:
+            daily_out = storage.write_processed(daily_metrics, "daily_metrics", output_format)
+            step.add_rows(rows_in=len(daily_metrics))
         logger.info(f"Saved daily metrics: {daily_out}")
+        instrument.record_rows(rows_out=len(daily_metrics))
     else:
         logger.warning("No 'at' column found, skipping daily metrics.")
 
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,117 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+from pathlib import Path
+from src import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fingerprints of the last successful run of each stage (delete the file to force a full run)
+STATE_FILE = config.DATA_DIR / "pipeline_state.json"
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_version(modules):
+    """
+    Hash of the source files of the given modules (e.g. "src.transform"). Modules are
+    located without importing them, so checking a skipped stage stays cheap.
+    """
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(Path(importlib.util.find_spec(module).origin).read_bytes())
+    return h.hexdigest()
+
+
+class StageState:
+    """
+    Make-like bookkeeping for pipeline stages. For each stage it stores the content
+    hashes of its input files, its parameters, the version of its code and the content
+    hashes of the outputs it produced. A stage is up to date when all of these still
+    match, so only stages downstream of an actual content change are re-run.
+    File hashes are cached by (size, mtime) to avoid re-reading unchanged files.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else STATE_FILE
+        self.stages = {}
+        self.files = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self.stages = state.get("stages", {})
+                self.files = state.get("files", {})
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Ignoring unreadable pipeline state {self.path}: {e}")
+
+    def fingerprint(self, path):
+        """Content hash of a file, or None if it does not exist."""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path.resolve())
+        cached = self.files.get(key)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = _sha256_file(path)
+        self.files[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def _signature(self, inputs, params, code):
+        return {
+            "inputs": {str(p): self.fingerprint(p) for p in inputs},
+            "params": json.loads(json.dumps(params, default=str)),
+            "code": code,
+        }
+
+    def is_fresh(self, name, inputs, outputs, params, code):
+        """True if the stage last ran on the same inputs, params and code and its outputs are untouched."""
+        record = self.stages.get(name)
+        if record is None:
+            return False
+        if {k: record.get(k) for k in ("inputs", "params", "code")} != self._signature(inputs, params, code):
+            return False
+        current = {str(p): self.fingerprint(p) for p in outputs}
+        return None not in current.values() and current == record.get("outputs")
+
+    def record(self, name, inputs, outputs, params, code):
+        """Stores the fingerprints of a successful stage run."""
+        record = self._signature(inputs, params, code)
+        record["outputs"] = {str(p): self.fingerprint(p) for p in outputs}
+        self.stages[name] = record
+        self.save()
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a half-written state file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, "files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def run(self, name, func, inputs, outputs, params, code, force=False):
+        """
+        Runs `func()` unless the stage is up to date (or `force`), then records it.
+        Returns True if the stage ran. `inputs` and `outputs` are file paths; `code` is
+        a code_version() of the modules the stage depends on.
+        """
+        if not force and self.is_fresh(name, inputs, outputs, params, code):
+            logger.info(f"Skipping {name}: inputs, parameters and code unchanged")
+            return False
+        func()
+        self.record(name, inputs, outputs, params, code)
+        return True
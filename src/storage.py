@@ -0,0 +1,250 @@
+import logging
+from src import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Processed-layer formats and their file extensions
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+}
+
+# Types carried by the columnar format (CSV loses them on the round trip)
+CATEGORICAL_COLS = ["app_name", "sentiment_hint"]
+BOOL_COLS = ["contradiction_flag"]
+
+# In-memory dtype plan of the reviews in the transform: categoricals for low-cardinality
+# strings, the smallest integers holding scores and thumbs (nullable, so missing scores
+# survive), and pandas' "str" for free text (Arrow-backed on pandas>=3 with pyarrow,
+# both pinned in requirements.txt)
+REVIEW_DTYPES = {
+    "app_id": "category",
+    "app_name": "category",
+    "sentiment_hint": "category",
+    "reviewId": "str",
+    "userName": "str",
+    "content": "str",
+    "score": "Int8",
+    "thumbsUpCount": "Int32",
+    "contradiction_flag": "bool",
+}
+
+
+def processed_path(name, fmt=None):
+    """
+    Path of a processed artifact (e.g. "apps_reviews") in the given format.
+    """
+    fmt = fmt or config.PROCESSED_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported processed format: {fmt}")
+    return config.PROCESSED_DIR / f"{name}{FORMATS[fmt]}"
+
+
+def find_processed(name):
+    """
+    Returns the most recently written copy of a processed artifact, or None.
+    """
+    candidates = [processed_path(name, fmt) for fmt in FORMATS]
+    candidates = [p for p in candidates if p.exists()]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: p.stat().st_mtime_ns)
+
+
+def _fits_integer(values, dtype):
+    import numpy as np
+    import pandas as pd
+
+    values = pd.to_numeric(values, errors="coerce").dropna()
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    return bool(((values % 1 == 0) & values.between(info.min, info.max)).all())
+
+
+def read_dtypes(plan=None):
+    """
+    The part of the dtype plan (default REVIEW_DTYPES) that readers apply while parsing:
+    strings and categoricals, which any value fits. Integers and booleans are left to
+    compact_dtypes, which skips lossy casts instead of failing the read.
+    """
+    import pandas as pd
+
+    plan = REVIEW_DTYPES if plan is None else plan
+    return {
+        col: dtype for col, dtype in plan.items()
+        if isinstance(pd.api.types.pandas_dtype(dtype), (pd.CategoricalDtype, pd.StringDtype))
+    }
+
+
+def compact_dtypes(df, plan=None):
+    """
+    Casts the columns of `df` named in the dtype plan (default REVIEW_DTYPES) and returns
+    the new frame. Integer casts are only made when lossless (integral values in range),
+    otherwise the column keeps its type; columns already of the planned type are kept.
+    """
+    import pandas as pd
+
+    plan = REVIEW_DTYPES if plan is None else plan
+    duplicated = set(df.columns[df.columns.duplicated()])
+    casts = {}
+    for col, dtype in plan.items():
+        if col not in df.columns or col in duplicated:
+            continue
+        target = pd.api.types.pandas_dtype(dtype)
+        if df[col].dtype == target:
+            continue
+        if pd.api.types.is_integer_dtype(target) and not _fits_integer(df[col], target):
+            logger.warning(f"Keeping {col} as {df[col].dtype}: values do not fit {target}")
+            continue
+        casts[col] = target
+    return df.astype(casts) if casts else df
+
+
+def memory_report(before, after):
+    """
+    Deep memory use in MB per column of two versions of a frame, plus a "total" row.
+    """
+    import pandas as pd
+
+    report = pd.DataFrame({
+        "before_mb": before.memory_usage(deep=True, index=False) / 2**20,
+        "after_mb": after.memory_usage(deep=True, index=False) / 2**20,
+    })
+    report.loc["total"] = report.sum()
+    return report
+
+
+def _storable(df):
+    # Nullable integers of the dtype plan are written as plain integers, or as floats
+    # when they hold missing values, so processed files read back as before
+    import pandas as pd
+
+    duplicated = set(df.columns[df.columns.duplicated()])
+    casts = {}
+    for col, dtype in df.dtypes.items():
+        if col in duplicated or not (pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_integer_dtype(dtype)):
+            continue
+        casts[col] = "float64" if df[col].hasnans else dtype.numpy_dtype
+    return df.astype(casts) if casts else df
+
+
+def _to_columnar(df):
+    # Parquet cannot store duplicated column names; keep the first occurrence
+    if df.columns.duplicated().any():
+        logger.warning(f"Dropping duplicated columns before writing Parquet: {list(df.columns[df.columns.duplicated()])}")
+        df = df.loc[:, ~df.columns.duplicated()]
+    dtypes = {c: "category" for c in CATEGORICAL_COLS if c in df.columns}
+    dtypes.update({c: "bool" for c in BOOL_COLS if c in df.columns})
+    return df.astype(dtypes)
+
+
+def write_processed(df, name, fmt=None):
+    """
+    Writes a processed artifact and returns its path.
+    """
+    fmt = fmt or config.PROCESSED_FORMAT
+    path = processed_path(name, fmt)
+    df = _storable(df)
+    if fmt == "parquet":
+        _to_columnar(df).to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def read_processed_file(path):
+    """
+    Loads one processed artifact file, in the format given by its extension.
+    """
+    # pandas is imported on use: path helpers are needed by stages that never load data
+    import pandas as pd
+    if path.suffix == ".parquet":
+        # Parquet keeps the types it was written with
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=read_dtypes())
+
+
+def read_processed(name):
+    """
+    Loads the most recently written copy of a processed artifact, or None if missing.
+    """
+    path = find_processed(name)
+    if path is None:
+        return None
+    return read_processed_file(path)
+
+
+def _arrow_type(dtype):
+    # Parquet type of a dtype-plan column across appended chunks: planned integers are
+    # stored as floats since a later chunk may hold missing or fractional values
+    import pandas as pd
+    import pyarrow as pa
+
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pa.dictionary(pa.int32(), pa.string())
+    if pd.api.types.is_bool_dtype(dtype):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(dtype):
+        return pa.float64()
+    return pa.string()
+
+
+class ProcessedAppender:
+    """
+    Appends DataFrame chunks to one processed artifact (used by streaming transforms).
+    Parquet column types come from the dtype plan (default REVIEW_DTYPES) rather than
+    from the first chunk, whose all-missing or integral columns would not fit later ones.
+    If nothing was written on close, a header-only artifact with `columns` is left behind;
+    if an exception is propagating, the partial artifact is removed instead.
+    """
+
+    def __init__(self, name, columns, fmt=None, plan=None):
+        self.fmt = fmt or config.PROCESSED_FORMAT
+        self.path = processed_path(name, self.fmt)
+        self.columns = columns
+        self.plan = REVIEW_DTYPES if plan is None else plan
+        self._writer = None
+        self._written = False
+
+    def __enter__(self):
+        return self
+
+    def _schema(self, table):
+        import pyarrow as pa
+
+        fields = []
+        for f in table.schema:
+            if f.name in self.plan:
+                f = pa.field(f.name, _arrow_type(self.plan[f.name]))
+            elif pa.types.is_dictionary(f.type):
+                # Widen dictionary indices so later chunks with more categories still fit
+                f = pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+            elif pa.types.is_null(f.type):
+                f = pa.field(f.name, pa.string())
+            fields.append(f)
+        return pa.schema(fields)
+
+    def write(self, df):
+        df = _storable(df)
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(_to_columnar(df), preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, self._schema(table))
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, index=False, mode="a" if self._written else "w", header=not self._written)
+        self._written = True
+
+    def __exit__(self, *exc):
+        if self._writer is not None:
+            self._writer.close()
+        if exc[0] is not None:
+            self.path.unlink(missing_ok=True)
+        elif not self._written:
+            import pandas as pd
+            write_processed(pd.DataFrame(columns=self.columns), self.path.stem, self.fmt)
+        return False
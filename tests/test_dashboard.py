@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from src import config, dashboard
+
+
+def write_processed(directory, daily_counts):
+    days = pd.date_range("2025-02-01", periods=len(daily_counts), freq="D")
+    pd.DataFrame({
+        "date": days.strftime("%Y-%m-%d"),
+        "daily_number_of_reviews": daily_counts,
+        "daily_average_rating": [3.5] * len(daily_counts),
+    }).to_csv(directory / "daily_metrics.csv", index=False)
+    pd.DataFrame({
+        "app_id": ["com.a.app"] * 3,
+        "reviewId": ["r1", "r2", "r3"],
+        "score": [1, 4, 5],
+    }).to_csv(directory / "apps_reviews.csv", index=False)
+    pd.DataFrame({
+        "app_id": ["com.a.app"],
+        "app_name": ["A"],
+        "average_rating": [3.33],
+    }).to_csv(directory / "app_kpis.csv", index=False)
+
+
+@pytest.fixture
+def processed_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROCESSED_DIR", tmp_path)
+    return tmp_path
+
+
+def test_png_sink_is_rewritten_after_a_run_without_it(processed_dir):
+    volume_png = processed_dir / "dashboard_daily_volume.png"
+    cached_png = processed_dir / dashboard.CACHE_DIRNAME / "volume.png"
+
+    write_processed(processed_dir, [4, 66, 12])
+    dashboard.run(sinks=["inline", "png"], max_workers=1)
+    first_image = volume_png.read_bytes()
+
+    # The data changes while the png sink is off, so only the cache follows it
+    write_processed(processed_dir, [40, 6, 120, 8])
+    dashboard.run(sinks=["inline"], max_workers=1)
+    assert volume_png.read_bytes() == first_image
+
+    # Switching the sink back on must export the chart of the current data
+    dashboard.run(sinks=["inline", "png"], max_workers=1)
+    assert volume_png.read_bytes() != first_image
+    assert volume_png.read_bytes() == cached_png.read_bytes()
+
+
+def test_unchanged_sink_files_are_not_rewritten(processed_dir):
+    write_processed(processed_dir, [4, 66, 12])
+    dashboard.run(sinks=["png"], max_workers=1)
+    volume_png = processed_dir / "dashboard_daily_volume.png"
+    mtime = volume_png.stat().st_mtime_ns
+
+    dashboard.run(sinks=["png"], max_workers=1)
+    assert volume_png.stat().st_mtime_ns == mtime
@@ -0,0 +1,36 @@
+import json
+
+import google_play_scraper
+import pytest
+
+from src import config, ingest_apps
+
+
+@pytest.fixture
+def output_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    return tmp_path / "apps_raw.json"
+
+
+def fake_app(app_id, lang, country):
+    if app_id.startswith("missing."):
+        raise ValueError(f"App not found: {app_id}")
+    return {"appId": app_id, "title": app_id.upper()}
+
+
+def test_fetched_apps_are_saved_in_request_order(output_file, monkeypatch):
+    monkeypatch.setattr(google_play_scraper, "app", fake_app)
+
+    ingest_apps.run(output_file, app_ids=["com.b.app", "missing.app", "com.a.app"])
+
+    saved = json.loads(output_file.read_text())
+    assert [entry["appId"] for entry in saved] == ["com.b.app", "com.a.app"]
+
+
+def test_previous_catalog_is_kept_when_no_app_is_fetched(output_file, monkeypatch):
+    monkeypatch.setattr(google_play_scraper, "app", fake_app)
+    output_file.write_text('[{"appId": "com.a.app"}]')
+
+    ingest_apps.run(output_file, app_ids=["missing.a", "missing.b"])
+
+    assert output_file.read_text() == '[{"appId": "com.a.app"}]'
@@ -0,0 +1,25 @@
+import json
+
+from src import config, ingest_reviews
+
+
+def test_run_returns_the_written_review_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    output_file = tmp_path / "reviews_raw.jsonl"
+
+    written = ingest_reviews.run(output_file=output_file, fetch=ingest_reviews.fake_reviews)
+
+    lines = output_file.read_text().splitlines()
+    assert written == len(lines) > 0
+    assert all(json.loads(line)["reviewId"] for line in lines)
+
+
+def test_run_many_counts_reviews_per_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    output_file = tmp_path / "reviews_raw.jsonl"
+
+    written = ingest_reviews.run_many(["com.a.app", "com.b.app"], output_file=output_file,
+                                      fetch=ingest_reviews.fake_reviews, max_requests_per_second=1000)
+
+    assert set(written) == {"com.a.app", "com.b.app"}
+    assert sum(written.values()) == len(output_file.read_text().splitlines())
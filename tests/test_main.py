@@ -0,0 +1,18 @@
+import sys
+
+import src
+from src import main, stages
+from tests.test_dashboard import processed_dir, write_processed  # noqa: F401 (fixture)
+
+
+def test_skipped_dashboard_stage_does_not_import_its_module(processed_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(stages, "STATE_FILE", tmp_path / "pipeline_state.json")
+    write_processed(processed_dir, [4, 66, 12])
+    main.run_pipeline(dashboard_sinks=["png"], run_stages=("dashboard",))
+    assert (processed_dir / "dashboard_daily_volume.png").exists()
+
+    # Forget the module so that importing it again would show up in sys.modules
+    monkeypatch.delitem(sys.modules, "src.dashboard")
+    monkeypatch.delattr(src, "dashboard")
+    main.run_pipeline(dashboard_sinks=["png"], run_stages=("dashboard",))
+    assert "src.dashboard" not in sys.modules
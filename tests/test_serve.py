@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from src import config, serve
+
+
+@pytest.fixture
+def reviews_file(tmp_path, monkeypatch, request):
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    df = pd.DataFrame({
+        "app_id": ["com.a.app", "com.a.app", "com.b.app"],
+        "app_name": ["A", "A", "B"],
+        "reviewId": ["r1", "r2", "r3"],
+        "score": [1, 5, 4],
+        "thumbsUpCount": [0, 3, 1],
+        "at": pd.to_datetime(["2025-02-01 10:00", "2025-02-02 11:00", "2025-02-02 12:00"]),
+    })
+    path = tmp_path / f"apps_reviews.{request.param}"
+    if request.param == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("reviews_file", ["csv", "parquet"], indirect=True)
+def test_duckdb_outputs_have_the_pandas_columns(reviews_file):
+    df = pd.read_parquet(reviews_file) if reviews_file.suffix == ".parquet" else pd.read_csv(reviews_file, parse_dates=["at"])
+    kpis, daily_metrics = serve.compute_serving_duckdb(reviews_file)
+
+    assert list(kpis.columns) == list(serve.compute_app_kpis(df).columns)
+    assert list(daily_metrics.columns) == ["date", "daily_number_of_reviews", "daily_average_rating"]
+
+
+@pytest.mark.parametrize("reviews_file", ["csv"], indirect=True)
+def test_kpi_without_sql_translation_is_an_error(reviews_file, monkeypatch):
+    monkeypatch.setitem(serve.APP_KPIS, "total_thumbs", ("thumbsUpCount", "sum"))
+
+    with pytest.raises(ValueError, match="total_thumbs"):
+        serve.compute_serving_duckdb(reviews_file)